@@ -0,0 +1,104 @@
+"""Evaluation of many chess positions at once with NumPy.
+
+Positions are encoded as rows of an N x 64 int8 array, one column per square (a1 = 0, h8 = 63 as in
+chessboard.SQUARES). A square holds 0 when empty, otherwise the piece code below, positive for white
+and negative for black. evaluate_batch scores every row with one table lookup and one sum, so the cost
+per position is a few array operations instead of a Python walk over the board.
+"""
+
+import numpy as np
+
+from chessboard import FIGURE_NAMES, PIECE_VALUES, PIECE_SQUARE_TABLES, SQUARES
+
+# Piece codes: 1 + the index in FIGURE_NAMES, and a separate code for a princess that has already eaten
+PIECE_CODES = {name: index + 1 for index, name in enumerate(FIGURE_NAMES)}
+EATEN_PRINCESS = len(FIGURE_NAMES) + 1
+CODE_NAMES = {code: name for name, code in PIECE_CODES.items()}
+CODE_NAMES[EATEN_PRINCESS] = 'Princess'
+
+_OFFSET = EATEN_PRINCESS
+# _SCORES[code + _OFFSET, square]: what a piece adds to white's score (material plus piece-square bonus)
+_SCORES = np.zeros((2 * EATEN_PRINCESS + 1, 64), dtype=np.int32)
+for _code, _name in CODE_NAMES.items():
+    for _square in range(64):
+        _SCORES[_code + _OFFSET, _square] = PIECE_VALUES[_name] + PIECE_SQUARE_TABLES[_name][_square]
+        _SCORES[-_code + _OFFSET, _square] = -(PIECE_VALUES[_name] + PIECE_SQUARE_TABLES[_name][_square ^ 56])
+_COLUMNS = np.arange(64)
+
+
+def piece_code(piece, eaten=False):
+    """Returns the signed int8 code of a piece (0 for None); eaten marks a princess that has eaten (Board.has_eaten)."""
+    if piece is None:
+        return 0
+    if eaten:
+        code = EATEN_PRINCESS
+    else:
+        code = PIECE_CODES[piece.name]
+    return code if piece.color == 'white' else -code
+
+
+def encode(board, out=None):
+    """Converts board.markup into a row of 64 int8 codes.
+
+    Args:
+        board (Board): The position.
+        out (numpy.ndarray, optional): Row to fill, e.g. a row of a larger batch; a new array by default.
+
+    Returns:
+        numpy.ndarray: The filled row.
+    """
+    if out is None:
+        out = np.empty(64, dtype=np.int8)
+    markup = board.markup
+    eaten = board.eaten
+    out[:] = [piece_code(markup[col][row - 1], eaten >> square & 1) for square, (col, row) in enumerate(SQUARES)]
+    return out
+
+
+def encode_many(boards):
+    """Converts a sequence of boards into an N x 64 int8 array."""
+    batch = np.empty((len(boards), 64), dtype=np.int8)
+    for index, board in enumerate(boards):
+        encode(board, batch[index])
+    return batch
+
+
+def evaluate_batch(positions, black_to_move=None):
+    """Scores a batch of encoded positions: material plus piece-square bonuses in centipawns.
+
+    Args:
+        positions (numpy.ndarray): N x 64 int8 array (a single row of 64 is accepted too).
+        black_to_move (numpy.ndarray, optional): N booleans; if given, each score is from the point of view
+            of the side to move, as engine.evaluate does, otherwise from white's.
+
+    Returns:
+        numpy.ndarray: N int32 scores.
+    """
+    positions = np.asarray(positions, dtype=np.int8)
+    if positions.ndim == 1:
+        positions = positions[np.newaxis]
+    scores = _SCORES[positions.astype(np.intp) + _OFFSET, _COLUMNS].sum(axis=1, dtype=np.int32)
+    if black_to_move is not None:
+        scores = np.where(np.asarray(black_to_move, dtype=bool), -scores, scores)
+    return scores
+
+
+def evaluate_children(board, moves=None):
+    """Scores the position after each move of the side to move, from that side's point of view.
+
+    Args:
+        board (Board): The position; it is returned unchanged.
+        moves (list, optional): Moves to score; all of board.turn's moves by default.
+
+    Returns:
+        tuple: (moves, scores) with scores an int32 array in the order of moves.
+    """
+    if moves is None:
+        moves = board.generate_moves(board.turn)
+    batch = np.empty((len(moves), 64), dtype=np.int8)
+    for index, move in enumerate(moves):
+        board.make_move(*move)
+        encode(board, batch[index])
+        board.unmake_move()
+    scores = evaluate_batch(batch)
+    return moves, scores if board.turn == 'white' else -scores
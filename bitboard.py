@@ -0,0 +1,233 @@
+from chessboard import (Board, COLUMNS, SQUARES, ORTHOGONAL, DIAGONAL, BETWEEN_SQUARES, KING_MASKS, KNIGHT_MASKS,
+                        KANGAROO_MASKS, _square_mask, iter_bits, Pawn, Rook, Knight, Bishop, Queen, King, Princess, Magnet, Kangaroo)
+
+FIGURE_TYPES = {
+    'Pawn': Pawn,
+    'Rook': Rook,
+    'Knight': Knight,
+    'Bishop': Bishop,
+    'Queen': Queen,
+    'King': King,
+    'Princess': Princess,
+    'Magnet': Magnet,
+    'Kangaroo': Kangaroo,
+}
+
+
+BETWEEN_MASKS = tuple({end: _square_mask(between) for end, between in BETWEEN_SQUARES[sq].items()} for sq in range(64))
+
+
+def _ray_masks(col_step, row_step):
+    """Builds a per-square mask of the squares in one direction, not including the square itself."""
+    masks = []
+    for col, row in SQUARES:
+        mask = 0
+        new_col, new_row = COLUMNS.index(col) + col_step, row + row_step
+        while 0 <= new_col < 8 and 1 <= new_row <= 8:
+            mask |= 1 << ((new_row - 1) * 8 + new_col)
+            new_col, new_row = new_col + col_step, new_row + row_step
+        masks.append(mask)
+    return tuple(masks)
+
+
+# (ray masks, True if the ray runs towards higher square indexes) for every direction of a slider
+ROOK_DIRECTIONS = tuple((_ray_masks(*step), step[1] > 0 or (step[1] == 0 and step[0] > 0)) for step in ORTHOGONAL)
+BISHOP_DIRECTIONS = tuple((_ray_masks(*step), step[1] > 0) for step in DIAGONAL)
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def slide_mask(square, occupied, directions):
+    """Returns the squares a slider reaches from the square: every ray up to and including its first blocker."""
+    reach = 0
+    for rays, increasing in directions:
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            first = (blockers & -blockers).bit_length() - 1 if increasing else blockers.bit_length() - 1
+            ray ^= rays[first]
+        reach |= ray
+    return reach
+
+
+# Pieces whose destinations are a table lookup masked by the squares of their own color.
+MASK_TABLES = (
+    ('Knight', KNIGHT_MASKS),
+    ('King', KING_MASKS),
+    ('Kangaroo', KANGAROO_MASKS),
+)
+
+# Sliders: their reach depends on the occupied squares, see slide_mask.
+SLIDER_DIRECTIONS = (
+    ('Rook', ROOK_DIRECTIONS),
+    ('Bishop', BISHOP_DIRECTIONS),
+    ('Queen', QUEEN_DIRECTIONS),
+)
+_SLIDERS = dict(SLIDER_DIRECTIONS)
+
+
+class BitBoard(Board):
+    """Chess board that keeps 64-bit masks of the squares every piece type occupies next to the lists of pieces.
+
+    Bit i of every mask stands for the square with index i (see chessboard.square_index). The columns of
+    markup are BitboardColumn lists: reading a square is a plain list lookup, and writing one also updates
+    the masks, so move_figure, undo_move and every can_move run unchanged. The masks serve set operations
+    only, such as the moves of jumping and sliding pieces. Moves cost a little more than on Board, since
+    both representations are kept up to date, so this is an alternative backend rather than a faster one.
+
+    Attributes:
+        bitboards (dict): Maps a color to a dict of piece name -> 64-bit mask of the squares it occupies.
+        colors (dict): Maps a color to the mask of all squares occupied by that color.
+        occupied (int): Mask of all occupied squares.
+        markup (dict): Columns of pieces as in Board, each a BitboardColumn.
+    """
+
+    def __init__(self):
+        """Initializes the bitboards with the starting positions."""
+        self._take_position(Board())
+
+    @classmethod
+    def from_board(cls, board):
+        """Creates a bitboard copy of a position stored in a regular Board.
+
+        Args:
+            board (Board): The board to copy.
+
+        Returns:
+            BitBoard: A board with the same pieces, move count and history.
+        """
+        bitboard = cls.__new__(cls)
+        bitboard._take_position(board)
+        bitboard.history = list(board.history)
+        # Board snapshots hold nothing but the pieces by square, so they restore a BitBoard as well
+        bitboard.checkpoints = dict(board.checkpoints)
+        bitboard._line = list(board._line)
+        return bitboard
+
+    def _take_position(self, board):
+        """Copies the pieces, move count, side to move and hash of a board, with an empty history."""
+        self.NONE = None
+        self.move_count = board.move_count
+        self.turn = board.turn
+        self.history = []
+        self._load(board.markup)
+        self.eaten = board.eaten
+        self.hash = board.hash
+        self._reset_counters()
+        self._start_line()
+
+    def copy(self):
+        """Returns an independent copy of the position; the pieces themselves are shared."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.NONE = None
+        clone.move_count = self.move_count
+        clone.turn = self.turn
+        clone.hash = self.hash
+        clone.history = list(self.history)
+        clone.bitboards = {color: dict(boards) for color, boards in self.bitboards.items()}
+        clone.colors = dict(self.colors)
+        clone.occupied = self.occupied
+        clone.eaten = self.eaten
+        clone.material = dict(self.material)
+        clone.positional = dict(self.positional)
+        clone.piece_counts = {color: dict(counts) for color, counts in self.piece_counts.items()}
+        clone.score = self.score
+        clone.locations = {color: {name: set(squares) for name, squares in types.items()}
+                           for color, types in self.locations.items()}
+        clone._attacks_from = list(self._attacks_from)
+        clone.markup = {col: BitboardColumn(clone, offset, self.markup[col]) for offset, col in enumerate(COLUMNS)}
+        clone.checkpoints = dict(self.checkpoints)
+        clone._line = list(self._line)
+        return clone
+
+    def _load(self, markup):
+        """Copies a dict of columns holding pieces or None and fills the masks from it."""
+        self.bitboards = {color: {name: 0 for name in FIGURE_TYPES} for color in ('white', 'black')}
+        self.colors = {'white': 0, 'black': 0}
+        self.occupied = 0
+        columns = {col: BitboardColumn(self, offset) for offset, col in enumerate(COLUMNS)}
+        for col, row in SQUARES:
+            piece = markup[col][row - 1]
+            if piece is not None:
+                columns[col][row - 1] = piece
+        self.markup = columns
+
+    def piece_at(self, square):
+        """Returns the piece on the square with the given index, or None if it is empty."""
+        col, row = SQUARES[square]
+        return self.markup[col][row - 1]
+
+    def set_piece(self, square, piece):
+        """Puts a piece (or None) on the square with the given index, replacing whatever was there."""
+        col, row = SQUARES[square]
+        self.markup[col][row - 1] = piece
+
+    def _move_bits(self, square, old, piece):
+        """Replaces old with piece (either may be None) on the square in the masks."""
+        bit = 1 << square
+        if old is not None:
+            self.bitboards[old.color][old.name] ^= bit
+            self.colors[old.color] ^= bit
+            self.occupied ^= bit
+        if piece is not None:
+            self.bitboards[piece.color][piece.name] |= bit
+            self.colors[piece.color] |= bit
+            self.occupied |= bit
+
+    def _attack_mask(self, name, color, square):
+        """Returns the attacked squares like Board._attack_mask, finding the reach of sliders with slide_mask."""
+        directions = _SLIDERS.get(name)
+        if directions is not None:
+            return slide_mask(square, self.occupied, directions)
+        return super()._attack_mask(name, color, square)
+
+    def path_clear(self, start, end):
+        """Checks that no piece stands strictly between two squares, with a single mask test."""
+        return not self.occupied & BETWEEN_MASKS[start].get(end, 0)
+
+    def generate_moves(self, color):
+        """Lists every legal move of the pieces of the given color.
+
+        Jumping pieces are resolved with precomputed masks and sliders with slide_mask, which stops every
+        ray at its first blocker; pawns, magnets and princesses fall back to their destinations method.
+
+        Args:
+            color (str): The color whose moves are listed ('white' or 'black').
+
+        Returns:
+            list: Tuples (start, end) of (str, int) positions, each accepted by move_figure.
+        """
+        moves = []
+        boards = self.bitboards[color]
+        free = ~self.colors[color]
+        markup = self.markup
+        for name, table in MASK_TABLES:
+            for sq in iter_bits(boards[name]):
+                start = SQUARES[sq]
+                for end in iter_bits(table[sq] & free):
+                    moves.append((start, SQUARES[end]))
+        for name, directions in SLIDER_DIRECTIONS:
+            for sq in iter_bits(boards[name]):
+                start = SQUARES[sq]
+                for end in iter_bits(slide_mask(sq, self.occupied, directions) & free):
+                    moves.append((start, SQUARES[end]))
+        for name in ('Pawn', 'Magnet', 'Princess'):
+            for sq in iter_bits(boards[name]):
+                start = SQUARES[sq]
+                for end in markup[start[0]][start[1] - 1].destinations(sq, self):
+                    moves.append((start, end))
+        return moves
+
+
+class BitboardColumn(list):
+    """One column of a BitBoard's markup, index 0 being row 1: a list of pieces that updates the masks when written."""
+
+    __slots__ = ('_board', '_offset')
+
+    def __init__(self, board, offset, pieces=(None,) * 8):
+        super().__init__(pieces)
+        self._board = board
+        self._offset = offset
+
+    def __setitem__(self, row_index, piece):
+        self._board._move_bits(row_index * 8 + self._offset, self[row_index], piece)
+        super().__setitem__(row_index, piece)
@@ -1,27 +1,92 @@
-class Board1:
+from console import CheckersConsole
+from events import IllegalMove, MoveResult, Observable
+
+# Шашки стоят только на 32 темных полях. Поле с номером i - бит i в 32-битных масках:
+# ряд (i // 4) + 1, в четных рядах (1, 3, 5, 7) поля a, c, e, g, в нечетных - b, d, f, h.
+SQUARE_POSITIONS = tuple(('abcdefgh'[(i % 4) * 2 + (i // 4) % 2], i // 4 + 1) for i in range(32))
+POSITION_SQUARES = {position: i for i, position in enumerate(SQUARE_POSITIONS)}
+FULL = (1 << 32) - 1
+
+# Направления (столбец, ряд): 0, 1 - вперед для белых, 2, 3 - вперед для черных
+DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+FORWARD = {'white': (0, 1), 'black': (2, 3)}
+ALL_DIRECTIONS = (0, 1, 2, 3)
+PROMOTION = {'white': 0xF << 28, 'black': 0xF}  # последний ряд для каждой стороны
+
+
+def _neighbour(i, direction, distance):
+    # Номер поля на расстоянии distance по диагонали или -1, если оно за краем доски
+    col, row = SQUARE_POSITIONS[i]
+    col_step, row_step = DIRECTIONS[direction]
+    col_num = 'abcdefgh'.index(col) + col_step * distance
+    if not 0 <= col_num < 8:
+        return -1
+    return POSITION_SQUARES.get(('abcdefgh'[col_num], row + row_step * distance), -1)
+
+
+# STEPS[i][d] - соседнее поле в направлении d (или -1), JUMPS[i][d] - (через какое поле, куда) или None
+STEPS = tuple(tuple(_neighbour(i, d, 1) for d in ALL_DIRECTIONS) for i in range(32))
+JUMPS = tuple(tuple((STEPS[i][d], _neighbour(i, d, 2)) if _neighbour(i, d, 2) >= 0 else None
+                    for d in ALL_DIRECTIONS) for i in range(32))
+
+
+def _step_shifts(direction):
+    # Для простых ходов: сдвиг номера поля и маска полей, откуда возможен такой сдвиг
+    shifts = {}
+    for i in range(32):
+        if STEPS[i][direction] >= 0:
+            shift = STEPS[i][direction] - i
+            shifts[shift] = shifts.get(shift, 0) | 1 << i
+    return tuple(shifts.items())
+
+
+STEP_SHIFTS = tuple(_step_shifts(d) for d in ALL_DIRECTIONS)
+
+
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _mask(positions):
+    mask = 0
+    for position in positions:
+        mask |= 1 << POSITION_SQUARES[position]
+    return mask
+
+
+class Board1(Observable):
     def __init__(self):
         self.NONE = None
         self.move_count = 0
+        self.turn = 'white'
+        self.history = []
+
+        # Позиция хранится в трех 32-битных масках: белые, черные и дамки (обоих цветов)
+        self.white = _mask((col, row) for col, row in SQUARE_POSITIONS if row <= 3)
+        self.black = _mask((col, row) for col, row in SQUARE_POSITIONS if row >= 6)
+        self.kings = 0
+        self._legal_cache = None
 
-        # Словарь для доски шашек (a-h, ряды 1-8)
-        self.markup = {
-            'a': [Checker('white'), self.NONE, Checker('white'), self.NONE, self.NONE, Checker('black'), self.NONE, Checker('black')],
-            'b': [self.NONE, Checker('white'), self.NONE, self.NONE, self.NONE, self.NONE, Checker('black'), self.NONE],
-            'c': [Checker('white'), self.NONE, Checker('white'), self.NONE, self.NONE, Checker('black'), self.NONE, Checker('black')],
-            'd': [self.NONE, Checker('white'), self.NONE, self.NONE, self.NONE, self.NONE, Checker('black'), self.NONE],
-            'e': [Checker('white'), self.NONE, Checker('white'), self.NONE, self.NONE, Checker('black'), self.NONE, Checker('black')],
-            'f': [self.NONE, Checker('white'), self.NONE, self.NONE, self.NONE, self.NONE, Checker('black'), self.NONE],
-            'g': [Checker('white'), self.NONE, Checker('white'), self.NONE, self.NONE, Checker('black'), self.NONE, Checker('black')],
-            'h': [self.NONE, Checker('white'), self.NONE, self.NONE, self.NONE, self.NONE, Checker('black'), self.NONE],
-        }
+    @property
+    def markup(self):
+        # Словарь для доски шашек (a-h, ряды 1-8), собирается из масок
+        markup = {col: [self.NONE] * 8 for col in 'abcdefgh'}
+        for i in iter_bits(self.white | self.black):
+            col, row = SQUARE_POSITIONS[i]
+            markup[col][row - 1] = self._checker_at((col, row))
+        return markup
 
     def draw_board(self):
+        markup = self.markup
         print("  a b c d e f g h")
         print("---------------------")
         for row in range(8, 0, -1):
             print(row, end="|")
             for col in 'abcdefgh':
-                variable = self.markup[col][row - 1]
+                variable = markup[col][row - 1]
                 if variable == self.NONE:
                     print(".", end=" ")
                 else:
@@ -54,44 +119,189 @@ class Board1:
             return (col, int(row))
 
     def move_figure(self, start, end, turn):
-        start_col, start_row = start
-        end_col, end_row = end
-        start_col_num = ord(start_col) - ord('a')
-        end_col_num = ord(end_col) - ord('a')
+        # Ничего не печатает: результат (MoveResult) получают подписчики, например CheckersConsole.
+        # end - поле, где шашка заканчивает ход; при множественном взятии промежуточные поля не вводятся.
+        move, reason = self._plan_move(start, end, turn)
+        if move is None:
+            result = MoveResult(False, reason, piece=self._checker_at(start))
+        else:
+            move = self._apply(*move)
+            result = MoveResult(True, move=move, piece=move.checker, captured=move.captured_checkers)
+        if self.observers:
+            self._notify('move', result)
+        return result
 
+    def make_move(self, *path):
+        # Ход стороны self.turn без вывода на экран: полный путь из generate_moves или (начало, конец).
+        # Возвращает CheckerMove или None
+        # По двум полям ход выбирается так же, как в move_figure (_plan_move)
+        squares = tuple(POSITION_SQUARES.get(position) for position in path)
+        moves = self._legal(self.turn)
+        if len(squares) == 2:
+            move = self._longest_chain(moves, *squares)
+            return None if move is None else self._apply(*move)
+        for move in moves:
+            if move[0] == squares:
+                return self._apply(*move)
+        return None
 
-        checker = self.markup[start_col][start_row - 1]
-        if checker == self.NONE or checker.color != turn:
-            print("Здесь нет вашей шашки.")
-            return False
+    def unmake_move(self):
+        if not self.history:
+            return None
+        move = self.history.pop()
+        start = 1 << move.squares[0]
+        end = 1 << move.squares[-1]
+        if move.color == 'white':
+            self.white = (self.white & ~end) | start
+            self.black |= move.captured
+        else:
+            self.black = (self.black & ~end) | start
+            self.white |= move.captured
+        self.kings &= ~end
+        if move.was_king:
+            self.kings |= start
+        self.kings |= move.captured_kings
+        self.move_count -= 1
+        self.turn = move.color
+        return move
+
+    def generate_moves(self, turn):
+        # Все допустимые ходы: кортежи полей (col, row) от начала до конца хода.
+        # Если можно бить, то бить обязательно, и взятие продолжается, пока есть кого бить.
+        return [tuple(SQUARE_POSITIONS[i] for i in path) for path, captured in self._legal(turn)]
+
+    def setup(self, pieces, turn='white', move_count=0):
+        # Расставляет шашки: pieces - словарь {(col, row): Checker}, только темные поля
+        self.white = self.black = self.kings = 0
+        for position, checker in pieces.items():
+            if position not in POSITION_SQUARES:
+                raise ValueError(f"{position[0]}{position[1]} - светлое поле, шашки там не стоят")
+            bit = 1 << POSITION_SQUARES[position]
+            if checker.color == 'white':
+                self.white |= bit
+            else:
+                self.black |= bit
+            if checker.king:
+                self.kings |= bit
+        self.turn = turn
+        self.move_count = move_count
+        self.history = []
+        self._legal_cache = None
+
+    def _checker_at(self, position):
+        i = POSITION_SQUARES.get(position)
+        if i is None or not (self.white | self.black) >> i & 1:
+            return None
+        return CHECKERS['white' if self.white >> i & 1 else 'black', bool(self.kings >> i & 1)]
 
-        if not checker.can_move((start_row, start_col), (end_row, end_col), self):
-            print("Недопустимый ход.")
-            return False
+    def _legal(self, turn):
+        # Ходы в виде (кортеж номеров полей, маска взятых шашек); результат запоминается до следующего хода
+        key = (self.white, self.black, self.kings, turn)
+        if self._legal_cache is not None and self._legal_cache[0] == key:
+            return self._legal_cache[1]
 
+        own, enemy = (self.white, self.black) if turn == 'white' else (self.black, self.white)
+        empty = ~(self.white | self.black) & FULL
+        kings = own & self.kings
 
-        target = self.markup[end_col][end_row - 1]
-        if target != self.NONE:
-            if target.color == checker.color:
-                print("Нельзя съесть свою шашку.")
-                return False
+        moves = []
+        for i in iter_bits(own):
+            self._collect_jumps(i, (i,), 0, enemy, empty | 1 << i, bool(kings >> i & 1), turn, moves)
+        if not moves:
+            forward = FORWARD[turn]
+            for direction in ALL_DIRECTIONS:
+                movers = own if direction in forward else kings
+                for shift, sources in STEP_SHIFTS[direction]:
+                    from_mask = movers & sources
+                    targets = (from_mask << shift if shift > 0 else from_mask >> -shift) & empty
+                    for target in iter_bits(targets):
+                        moves.append(((target - shift, target), 0))
+        self._legal_cache = (key, moves)
+        return moves
 
-            jump_row = (start_row + end_row) // 2
-            jump_col = chr((ord(start_col) + ord(end_col)) // 2)
-            jumped_checker = self.markup[jump_col][jump_row - 1]
-            if jumped_checker == self.NONE or jumped_checker.color == checker.color:
-                print("Невозможно съесть шашку.")
-                return False
+    def _collect_jumps(self, i, path, captured, enemy, empty, is_king, turn, moves):
+        # Перебирает цепочки взятий из поля i; взятые шашки снимаются только после хода,
+        # поэтому через них нельзя прыгнуть второй раз и на их поле нельзя встать
+        extended = False
+        for direction in ALL_DIRECTIONS if is_king else FORWARD[turn]:
+            jump = JUMPS[i][direction]
+            if jump is None:
+                continue
+            over, land = jump
+            if enemy >> over & 1 and not captured >> over & 1 and empty >> land & 1:
+                extended = True
+                new_path = path + (land,)
+                new_captured = captured | 1 << over
+                if not is_king and PROMOTION[turn] >> land & 1:
+                    moves.append((new_path, new_captured))  # шашка стала дамкой - ход окончен
+                elif not self._collect_jumps(land, new_path, new_captured, enemy, empty, is_king, turn, moves):
+                    moves.append((new_path, new_captured))
+        return extended
 
-            self.markup[jump_col][jump_row - 1] = self.NONE
-            print(f"Шашка {jumped_checker} съедена.")
+    def _longest_chain(self, moves, start_square, end_square):
+        # Ход из start_square в end_square; если туда ведут разные цепочки, берется та, где взято больше шашек
+        chosen = [move for move in moves if move[0][0] == start_square and move[0][-1] == end_square]
+        return max(chosen, key=lambda move: bin(move[1]).count('1'), default=None)
 
-        self.markup[end_col][end_row - 1] = checker
-        self.markup[start_col][start_row - 1] = self.NONE
-        print(f"Ход выполнен: {start_col}{start_row} -> {end_col}{end_row}")
-        return True
+    def _plan_move(self, start, end, turn):
+        start_square = POSITION_SQUARES.get(start)
+        end_square = POSITION_SQUARES.get(end)
+        own = self.white if turn == 'white' else self.black
+        if start_square is None or not own >> start_square & 1:
+            return None, IllegalMove.NOT_YOUR_PIECE
+
+        moves = self._legal(turn)
+        chosen = self._longest_chain(moves, start_square, end_square)
+        if chosen is not None:
+            return chosen, None
+
+        if end_square is None:
+            return None, IllegalMove.AGAINST_RULES
+        if any(move[0][0] == start_square and end_square in move[0][1:] for move in moves):
+            return None, IllegalMove.MUST_CONTINUE_JUMP
+        if own >> end_square & 1:
+            return None, IllegalMove.OWN_PIECE
+        directions = ALL_DIRECTIONS if self.kings >> start_square & 1 else FORWARD[turn]
+        if any(STEPS[start_square][d] == end_square for d in directions):
+            if moves and moves[0][1] and not (self.white | self.black) >> end_square & 1:
+                return None, IllegalMove.MUST_CAPTURE
+            return None, IllegalMove.AGAINST_RULES
+        if any(JUMPS[start_square][d] is not None and JUMPS[start_square][d][1] == end_square for d in directions):
+            return None, IllegalMove.NOTHING_TO_JUMP
+        return None, IllegalMove.AGAINST_RULES
+
+    def _apply(self, path, captured):
+        start = 1 << path[0]
+        end = 1 << path[-1]
+        color = 'white' if self.white & start else 'black'
+        was_king = bool(self.kings & start)
+        captured_kings = self.kings & captured
+        if color == 'white':
+            self.white = (self.white & ~start) | end
+            self.black &= ~captured
+        else:
+            self.black = (self.black & ~start) | end
+            self.white &= ~captured
+        self.kings &= ~(start | captured)
+        promoted = not was_king and bool(PROMOTION[color] & end)
+        if was_king or promoted:
+            self.kings |= end
+        move = CheckerMove(path, color, was_king, captured, captured_kings, promoted)
+        self.history.append(move)
+        self.move_count += 1
+        self.turn = 'black' if color == 'white' else 'white'
+        return move
 
     def play(self):
+        # Консоль подписана только на время партии, иначе повторный play() печатал бы всё дважды
+        console = CheckersConsole()
+        self.subscribe(console)
+        try:
+            self._play()
+        finally:
+            self.unsubscribe(console)
+
+    def _play(self):
         turn = 'white'
         while True:
             self.draw_board()
@@ -100,6 +310,9 @@ class Board1:
                 print('Ход белых ')
             else:
                 print('Ход черных')
+            if not self.generate_moves(turn):
+                print(f"Ходов нет. Победили {'черные' if turn == 'white' else 'белые'}.")
+                break
             start = self.get_position(turn)
             end = self.get_position(turn)
             if self.move_figure(start, end, turn):
@@ -111,51 +324,87 @@ class Board1:
                     turn = 'white'
            
                     
+
+class CheckerMove:
+    # Ход шашки: путь по номерам полей и всё, что нужно для его отмены
+    def __init__(self, squares, color, was_king, captured, captured_kings, promoted):
+        self.squares = squares
+        self.color = color
+        self.was_king = was_king
+        self.captured = captured  # маска взятых шашек
+        self.captured_kings = captured_kings  # какие из них были дамками
+        self.promoted = promoted
+
+    @property
+    def start(self):
+        return SQUARE_POSITIONS[self.squares[0]]
+
+    @property
+    def end(self):
+        return SQUARE_POSITIONS[self.squares[-1]]
+
+    @property
+    def path(self):
+        return tuple(SQUARE_POSITIONS[i] for i in self.squares)
+
+    @property
+    def checker(self):
+        return CHECKERS[self.color, self.was_king]
+
+    @property
+    def captured_checkers(self):
+        enemy = 'black' if self.color == 'white' else 'white'
+        return tuple(CHECKERS[enemy, bool(self.captured_kings >> i & 1)] for i in iter_bits(self.captured))
+
+
 class Figure:
+    __slots__ = ('name', 'color')
+
     def __init__(self, name, color):
-        self.name = name
-        self.color = color
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'color', color)
+
+    def __setattr__(self, name, value):
+        # Шашки общие для всех досок (см. CHECKERS), менять их нельзя
+        raise AttributeError(f"{self.name} pieces are shared between boards and cannot be changed")
 
     def can_move(self, start, end):
         pass
 
 
 class Checker(Figure):
-    def __init__(self, color):
+    __slots__ = ('king',)
+    _instances = {}
+
+    def __new__(cls, color, king=False):
+        # Всего четыре разные шашки: Checker(color, king) всегда возвращает одну и ту же
+        checker = cls._instances.get((color, king))
+        if checker is None:
+            checker = cls._instances[color, king] = super().__new__(cls)
+        return checker
+
+    def __init__(self, color, king=False):
         super().__init__("Checker", color)
+        object.__setattr__(self, 'king', king)
+
+    def __reduce__(self):
+        return self.__class__, (self.color, self.king)
 
     def __str__(self):
+        # Простая шашка - W или B, дамка - w или b
+        if self.king:
+            return "w" if self.color == "white" else "b"
         return "W" if self.color == "white" else "B"
 
     def can_move(self, start, end, board):
+        # start, end - (row, col); ход должен быть среди допустимых ходов доски (с обязательным взятием)
         start_row, start_col = start
         end_row, end_col = end
-        start_col_num = ord(start_col) - ord('a')
-        end_col_num = ord(end_col) - ord('a')
-
-        row_diff = end_row - start_row
-        col_diff = end_col_num - start_col_num
+        return any(move[0] == (start_col, start_row) and move[-1] == (end_col, end_row)
+                   for move in board.generate_moves(self.color))
 
 
-        if self.color == 'white':
-            if row_diff == 1 and abs(col_diff) == 1:
-                return board.markup[end_col][end_row - 1] == board.NONE
-
-            if row_diff == 2 and abs(col_diff) == 2:
-                jump_row = (start_row + end_row) // 2
-                jump_col = chr((ord(start_col) + ord(end_col)) // 2)
-                jumped_checker = board.markup[jump_col][jump_row - 1]
-                return jumped_checker != board.NONE and jumped_checker.color != self.color
-        else:
-            if row_diff == -1 and abs(col_diff) == 1:
-                return board.markup[end_col][end_row - 1] == board.NONE
-
-            if row_diff == -2 and abs(col_diff) == 2:
-                jump_row = (start_row + end_row) // 2
-                jump_col = chr((ord(start_col) + ord(end_col)) // 2)
-                jumped_checker = board.markup[jump_col][jump_row - 1]
-                return jumped_checker != board.NONE and jumped_checker.color != self.color
-        return False
+CHECKERS = {(color, king): Checker(color, king) for color in ('white', 'black') for king in (False, True)}
 
 
 if __name__ == "__main__":
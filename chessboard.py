@@ -1,11 +1,207 @@
-class Board:
+import random
+
+from console import ChessConsole
+from events import GameState, IllegalMove, MoveResult, Observable
+
+COLUMNS = 'abcdefgh'
+
+# Square index: (row - 1) * 8 + column number, so a1 = 0, h1 = 7, a8 = 56, h8 = 63.
+SQUARES = tuple((col, row) for row in range(1, 9) for col in COLUMNS)
+SQUARE_INDEXES = {position: index for index, position in enumerate(SQUARES)}
+
+
+def square_index(col, row):
+    """Returns the index (0-63) of the square given by its column letter and row number."""
+    return (row - 1) * 8 + COLUMNS.index(col)
+
+
+def _offset_table(offsets):
+    """Builds a per-square tuple of the positions reachable by the given (column, row) offsets."""
+    table = []
+    for col, row in SQUARES:
+        col_num = COLUMNS.index(col)
+        targets = []
+        for col_step, row_step in offsets:
+            new_col, new_row = col_num + col_step, row + row_step
+            if 0 <= new_col < 8 and 1 <= new_row <= 8:
+                targets.append((COLUMNS[new_col], new_row))
+        table.append(tuple(targets))
+    return tuple(table)
+
+
+def _ray_table(directions):
+    """Builds a per-square tuple of rays, each listing positions from the nearest square outwards."""
+    table = []
+    for col, row in SQUARES:
+        col_num = COLUMNS.index(col)
+        rays = []
+        for col_step, row_step in directions:
+            ray = []
+            new_col, new_row = col_num + col_step, row + row_step
+            while 0 <= new_col < 8 and 1 <= new_row <= 8:
+                ray.append((COLUMNS[new_col], new_row))
+                new_col, new_row = new_col + col_step, new_row + row_step
+            if ray:
+                rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return tuple(table)
+
+
+ORTHOGONAL = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIAGONAL = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+KING_STEPS = _offset_table(ORTHOGONAL + DIAGONAL)
+KNIGHT_JUMPS = _offset_table(((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+KANGAROO_JUMPS = _offset_table(tuple((col_step * 3, row_step * 3) for col_step, row_step in ORTHOGONAL + DIAGONAL))
+ORTHOGONAL_RAYS = _ray_table(ORTHOGONAL)
+DIAGONAL_RAYS = _ray_table(DIAGONAL)
+QUEEN_RAYS = tuple(ORTHOGONAL_RAYS[sq] + DIAGONAL_RAYS[sq] for sq in range(64))
+
+# BETWEEN_SQUARES[start][end]: the positions strictly between two squares on a common line, nearest to start first.
+# Only squares on one of the eight lines through start are keys.
+BETWEEN_SQUARES = tuple({SQUARE_INDEXES[end]: ray[:distance] for ray in QUEEN_RAYS[sq] for distance, end in enumerate(ray)}
+                        for sq in range(64))
+
+
+def _square_mask(positions):
+    """Returns a 64-bit mask with the bit of every (str, int) position set."""
+    mask = 0
+    for position in positions:
+        mask |= 1 << SQUARE_INDEXES[position]
+    return mask
+
+
+def iter_bits(mask):
+    """Yields the indexes of the set bits of a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _pawn_attacks(color, col, row):
+    """Returns the mask of the squares a pawn can capture on; they are the squares of Pawn.destinations."""
+    if color == 'white':
+        ends = [(col, row + 1)] if row < 8 else []
+        if row == 1:
+            ends.append((col, 3))
+    else:
+        ends = [(col, row - 1)] if row > 1 else []
+        if row == 6:
+            ends.append((col, 4))
+    return _square_mask(ends)
+
+
+KING_MASKS = tuple(_square_mask(KING_STEPS[sq]) for sq in range(64))
+KNIGHT_MASKS = tuple(_square_mask(KNIGHT_JUMPS[sq]) for sq in range(64))
+KANGAROO_MASKS = tuple(_square_mask(KANGAROO_JUMPS[sq]) for sq in range(64))
+PAWN_ATTACK_MASKS = {color: tuple(_pawn_attacks(color, col, row) for col, row in SQUARES) for color in ('white', 'black')}
+
+# Squares attacked by pieces whose reach does not depend on other pieces. A magnet's pull is not a capture,
+# so it attacks only the squares next to it.
+ATTACK_MASKS = {
+    'Knight': KNIGHT_MASKS,
+    'King': KING_MASKS,
+    'Magnet': KING_MASKS,
+    'Kangaroo': KANGAROO_MASKS,
+}
+
+
+def _bit_rays(table):
+    """Turns a table of rays of positions into rays of (bit, column letter, row index) triples."""
+    return tuple(tuple(tuple((1 << SQUARE_INDEXES[col, row], col, row - 1) for col, row in ray) for ray in rays)
+                 for rays in table)
+
+
+# SLIDER_RAYS[name][sq]: the rays of a slider as (bit, column letter, row index) triples, nearest square first.
+_ROOK_BIT_RAYS = _bit_rays(ORTHOGONAL_RAYS)
+_BISHOP_BIT_RAYS = _bit_rays(DIAGONAL_RAYS)
+SLIDER_RAYS = {
+    'Rook': _ROOK_BIT_RAYS,
+    'Bishop': _BISHOP_BIT_RAYS,
+    'Queen': tuple(_ROOK_BIT_RAYS[sq] + _BISHOP_BIT_RAYS[sq] for sq in range(64)),
+}
+
+FIGURE_NAMES = ('Pawn', 'Rook', 'Knight', 'Bishop', 'Queen', 'King', 'Princess', 'Magnet', 'Kangaroo')
+
+# Material values in centipawns. The king is worth more than everything else together, since capturing it wins.
+PIECE_VALUES = {
+    'Pawn': 100,
+    'Knight': 300,
+    'Bishop': 320,
+    'Rook': 500,
+    'Queen': 900,
+    'King': 20000,
+    'Princess': 450,  # one capture of any non-queen piece anywhere, then king steps on even moves
+    'Magnet': 350,  # king steps plus pulling enemies from up to five squares away
+    'Kangaroo': 280,  # jumps exactly three squares in any of the eight directions
+}
+
+
+def _centre_table(weight):
+    """Builds a piece-square table worth weight per step a square is away from the edges of the board."""
+    return tuple(weight * (min(COLUMNS.index(col), 7 - COLUMNS.index(col)) + min(row - 1, 8 - row))
+                 for col, row in SQUARES)
+
+
+# Piece-square bonuses in centipawns, indexed by square for white; black uses the mirrored square (sq ^ 56).
+PIECE_SQUARE_TABLES = {
+    'Pawn': tuple(5 * max(row - 2, 0) + (5 if col in 'de' else 0) for col, row in SQUARES),
+    'Knight': _centre_table(5),
+    'Bishop': _centre_table(3),
+    'Rook': _centre_table(1),
+    'Queen': _centre_table(2),
+    'King': _centre_table(-5),  # the king is safest near the edge
+    'Princess': _centre_table(2),
+    'Magnet': _centre_table(4),  # from the centre a magnet reaches more lines
+    'Kangaroo': _centre_table(3),
+}
+
+
+# Zobrist keys. The fixed seed keeps hashes identical between runs and worker processes.
+# A princess that has already eaten is hashed as a separate kind of piece.
+_zobrist_random = random.Random(20240229)
+ZOBRIST_PIECES = {(color, name): tuple(_zobrist_random.getrandbits(64) for _ in range(64))
+                  for color in ('white', 'black') for name in FIGURE_NAMES + ('EatenPrincess',)}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+ZOBRIST_ODD_MOVE = _zobrist_random.getrandbits(64)
+
+
+# Every CHECKPOINT_INTERVAL plies of a game the board keeps a snapshot of the position, so goto_ply only
+# replays the moves after the nearest one. Restoring a snapshot costs about as much as replaying
+# CHECKPOINT_RESTORE_COST moves, which decides between restoring and walking from the current position.
+CHECKPOINT_INTERVAL = 16
+CHECKPOINT_RESTORE_COST = 6
+
+
+def zobrist_key(piece, square, eaten=False):
+    """Returns the Zobrist key of a piece standing on the square with the given index; eaten marks a princess that has eaten."""
+    if eaten:
+        return ZOBRIST_PIECES[piece.color, 'EatenPrincess'][square]
+    return ZOBRIST_PIECES[piece.color, piece.name][square]
+
+
+class Board(Observable):
     """Chess board that manages the board state, pieces, moves, and game history.
 
     Attributes:
         NONE (None): Constant representing an empty square on the board.
         move_count (int): Counter for moves.
+        turn (str): The side to move ('white' or 'black').
         history (list): List of Move objects representing the move history.
         markup (dict): Dictionary representing the board state. Keys are column letters ('a'-'h') and values are lists of pieces or None.
+        hash (int): Zobrist hash of the pieces, the side to move, move_count parity and the eaten mask.
+        material (dict): Maps a color to the total PIECE_VALUES of its pieces on the board.
+        positional (dict): Maps a color to the sum of the PIECE_SQUARE_TABLES bonuses of its pieces.
+        piece_counts (dict): Maps a color to a dict of the number of its pieces of every type.
+        score (int): White's material and positional total minus black's, i.e. the evaluation for white.
+        eaten (int): Mask of the squares (bit i for square index i) of princesses that have already captured a piece.
+        locations (dict): Maps a color to a dict mapping every piece type to the set of square indexes it stands on.
+        checkpoints (dict): Maps a ply (number of moves since the start or the last setup) to a snapshot of
+            the position after it; ply 0 is always there, then one every CHECKPOINT_INTERVAL plies reached
+            with move_figure or goto_ply.
+        observers (tuple): Subscribed front ends (see events.Observable); they get 'move', 'undo' and
+            'seek' events.
     """
 
     def __init__(self):
@@ -13,6 +209,7 @@ class Board:
 
         self.NONE = None
         self.move_count = 0
+        self.turn = 'white'
         self.history = []
         self.markup = {
             'a': [Rook('white'), Magnet('white'), self.NONE, self.NONE, self.NONE, self.NONE, Magnet('black'),
@@ -32,6 +229,10 @@ class Board:
             'h': [Rook('white'), Kangaroo('white'), self.NONE, self.NONE, self.NONE, self.NONE, Kangaroo('black'),
                   Rook('black')],
         }
+        self.eaten = 0
+        self.hash = self.compute_hash()
+        self._reset_counters()
+        self._start_line()
 
     def draw_board(self):
         """Prints the board to the console in a formatted layout."""
@@ -53,12 +254,82 @@ class Board:
     def move_figure(self, start, end):
         """Moves a piece from the starting position to the ending position.
 
+        Nothing is printed here; subscribed observers receive the result as a 'move' event.
+
+        Args:
+            start (tuple): A tuple (str, int) representing the piece's starting position.
+            end (tuple): A tuple (str, int) representing the piece's ending position.
+
+        Returns:
+            MoveResult: True if the move was successful; otherwise its reason tells why it was refused.
+        """
+
+        move, reason = self._plan_move(start, end)
+        if move is None:
+            result = MoveResult(False, reason, piece=self.markup[start[0]][start[1] - 1])
+        else:
+            self._apply(move)
+            if move.pulled_to is not None:
+                result = MoveResult(True, move=move, piece=move.point, pulled=move.target)
+            else:
+                result = MoveResult(True, move=move, piece=move.point, captured=move.target)
+            self._sync_line()
+            self._add_checkpoint()
+        if self.observers:
+            self._notify('move', result)
+        return result
+
+    def make_move(self, start, end):
+        """Makes a move in place without printing anything.
+
+        The returned Move records everything unmake_move needs to restore the position exactly:
+        the captured or pulled piece, the square it was pulled to and the princesses' eaten flags.
+
+        Args:
+            start (tuple): A tuple (str, int) representing the piece's starting position.
+            end (tuple): A tuple (str, int) representing the piece's ending position.
+
+        Returns:
+            Move: The move that was made, or None if the move is not allowed.
+        """
+
+        move, error = self._plan_move(start, end)
+        if move is not None:
+            self._apply(move)
+        return move
+
+    def unmake_move(self):
+        """Takes back the last move in place without printing anything.
+
+        Returns:
+            Move: The move that was taken back, or None if there are no moves in the history.
+        """
+
+        if not self.history:
+            return None
+
+        move = self.history.pop()
+        start_col, start_row = move.start
+        end_col, end_row = move.end
+        if move.pulled_to is not None:
+            pulled_col, pulled_row = move.pulled_to
+            self._put(pulled_col, pulled_row, self.NONE)
+            self._put(end_col, end_row, move.target, move.target_eaten)
+        else:
+            self._put(end_col, end_row, move.target, move.target_eaten)
+            self._put(start_col, start_row, move.point, move.point_eaten)
+        self._advance(-1)
+        return move
+
+    def _plan_move(self, start, end):
+        """Checks a move against the rules without changing the board.
+
         Args:
             start (tuple): A tuple (str, int) representing the piece's starting position.
             end (tuple): A tuple (str, int) representing the piece's ending position.
 
         Returns:
-            bool: True if the move was successful, otherwise False.
+            tuple: (Move, None) if the move is allowed, otherwise (None, IllegalMove).
         """
 
         start_col, start_row = start
@@ -67,15 +338,14 @@ class Board:
         target = self.markup[end_col][end_row - 1]
 
         if point == self.NONE:
-            print("Фигуры тут нет")
-            return False
+            return None, IllegalMove.NO_PIECE
 
         if not point.can_move((start_row, start_col), (end_row, end_col), self):
-            print("Не допустимый ход")
-            return False
+            return None, IllegalMove.AGAINST_RULES
 
         move = Move(start, end, point, target)
-        self.history.append(move)
+        move.point_eaten = self.has_eaten(square_index(start_col, start_row))
+        move.target_eaten = self.has_eaten(square_index(end_col, end_row))
 
         if isinstance(point, Magnet):
             start_col_num = ord(start_col) - ord('a')
@@ -89,47 +359,84 @@ class Board:
                 new_col = chr(ord(end_col) + col_step)
 
                 if self.markup[new_col][new_row - 1] == self.NONE:
-                    self.markup[new_col][new_row - 1] = target
-                    self.markup[end_col][end_row - 1] = self.NONE
-                    print(f"Фигура {target} притянута к {new_col}{new_row}")
-                    self.move_count += 1
-                    self.draw_board()
-                    return True
+                    move.pulled_to = (new_col, new_row)
+                    return move, None
                 else:
-                    print("Клетка для притягивания занята")
-                    return False
+                    return None, IllegalMove.PULL_SQUARE_OCCUPIED
         if isinstance(point, Princess):
             if target != self.NONE:
                 if self._is_enemy(point, target):
                     if target.name == "Queen":
-                        print("Принцесса не может съесть королеву!")
-                        return False
+                        return None, IllegalMove.PRINCESS_CANNOT_EAT_QUEEN
                     if self.move_count % 2 == 0:  # Проверка на четный ход
-                        print(f"Принцесса съела фигуру {target}")
-                        self.markup[end_col][end_row - 1] = point
-                        self.markup[start_col][start_row - 1] = self.NONE
-                        self.move_count += 1
-                        self.draw_board()
-                        return True
+                        move.eaten = not move.point_eaten
+                        return move, None
                     else:
-                        print("Принцесса может съедать фигуры только на четных ходах!")
-                        return False
+                        return None, IllegalMove.PRINCESS_ODD_MOVE
                 else:
-                    print("Вы пытаетесь съесть свою фигуру!")
-                    return False
+                    return None, IllegalMove.OWN_PIECE
 
         if target != self.NONE:
-            if self._is_enemy(point, target):
-                print(f"Фигуру {target} съели")
-            else:
-                print("вы решили убить свою фигуру (партизан)")
-                return False
+            if not self._is_enemy(point, target):
+                return None, IllegalMove.OWN_PIECE
+
+        return move, None
+
+    def _apply(self, move):
+        """Changes the board according to a move approved by _plan_move and records it in the history."""
+
+        start_col, start_row = move.start
+        end_col, end_row = move.end
+        if move.pulled_to is not None:
+            pulled_col, pulled_row = move.pulled_to
+            self._put(pulled_col, pulled_row, move.target, move.target_eaten)
+            self._put(end_col, end_row, self.NONE)
+        else:
+            self._put(start_col, start_row, self.NONE)
+            self._put(end_col, end_row, move.point, move.point_eaten or move.eaten)
+        self.history.append(move)
+        self._advance(1)
+
+    def setup(self, pieces, turn='white', move_count=0, eaten=()):
+        """Replaces the position with the given pieces and clears the history.
+
+        Args:
+            pieces (dict): Maps (str, int) positions to pieces; all other squares become empty.
+            turn (str): The side to move ('white' or 'black').
+            move_count (int): The number of moves already made; its parity matters to princesses.
+            eaten (iterable): (str, int) positions of the princesses that have already captured a piece.
 
-        self.markup[end_col][end_row - 1] = point
-        self.markup[start_col][start_row - 1] = self.NONE
-        print(f"Ход выполнен успешно: {start_col}{start_row} -> {end_col}{end_row}")
-        self.move_count += 1
-        self.draw_board()
+        Raises:
+            ValueError: If a position in eaten does not hold a princess.
+        """
+
+        eaten = set(eaten)
+        for position in eaten:
+            piece = pieces.get(position)
+            if piece is None or piece.name != 'Princess':
+                raise ValueError(f"{position[0]}{position[1]} is marked as an eaten princess but holds no princess")
+        for col, row in SQUARES:
+            self._put(col, row, pieces.get((col, row), self.NONE), (col, row) in eaten)
+        self.turn = turn
+        self.move_count = move_count
+        self.history = []
+        self.hash = self.compute_hash()
+        self._start_line()
+
+    def path_clear(self, start, end):
+        """Checks that no piece stands strictly between two squares.
+
+        Args:
+            start (int): Index of the first square.
+            end (int): Index of the second square; squares that are not on a common line count as clear.
+
+        Returns:
+            bool: True if every square in between is empty.
+        """
+        markup = self.markup
+        for col, row in BETWEEN_SQUARES[start].get(end, ()):
+            if markup[col][row - 1] is not None:
+                return False
         return True
 
     def _is_enemy(self, figure1, figure2):
@@ -144,35 +451,403 @@ class Board:
         """
         return figure1.color != figure2.color
 
-    def undo_move(self, turn):
-        """Reverts the last move and restores the board state.
+    def _put(self, col, row, piece, eaten=False):
+        """Puts a piece (or None) on a square and updates the Zobrist hash accordingly.
 
         Args:
-            turn (str): The current player's turn ('white' or 'black').
+            col (str): The column letter of the square.
+            row (int): The row number of the square.
+            piece (Figure): The piece to put, or None to empty the square.
+            eaten (bool): Whether the piece is a princess that has already captured a piece.
+        """
+        column = self.markup[col]
+        square = (row - 1) * 8 + COLUMNS.index(col)
+        bit = 1 << square
+        old = column[row - 1]
+        if old is not None:
+            self.hash ^= zobrist_key(old, square, self.eaten & bit)
+            self._count(old, square, -1)
+            self.locations[old.color][old.name].discard(square)
+            self.eaten &= ~bit
+        if piece is not None:
+            self.hash ^= zobrist_key(piece, square, eaten)
+            self._count(piece, square, 1)
+            self.locations[piece.color][piece.name].add(square)
+            if eaten:
+                self.eaten |= bit
+        column[row - 1] = piece
+        self._update_attacks(square, old, piece)
+
+    def _count(self, piece, square, sign):
+        """Adds (sign 1) or removes (sign -1) a piece on the square to or from the material counters."""
+        color = piece.color
+        value = PIECE_VALUES[piece.name] * sign
+        if color == 'white':
+            bonus = PIECE_SQUARE_TABLES[piece.name][square] * sign
+            self.score += value + bonus
+        else:
+            bonus = PIECE_SQUARE_TABLES[piece.name][square ^ 56] * sign
+            self.score -= value + bonus
+        self.material[color] += value
+        self.positional[color] += bonus
+        self.piece_counts[color][piece.name] += sign
+
+    def _reset_counters(self):
+        """Computes material, positional, piece_counts, score and locations from scratch; _put keeps them up to date."""
+        self.material = {'white': 0, 'black': 0}
+        self.positional = {'white': 0, 'black': 0}
+        self.piece_counts = {color: dict.fromkeys(FIGURE_NAMES, 0) for color in ('white', 'black')}
+        self.score = 0
+        self.locations = {color: {name: set() for name in FIGURE_NAMES} for color in ('white', 'black')}
+        for square, (col, row) in enumerate(SQUARES):
+            piece = self.markup[col][row - 1]
+            if piece is not None:
+                self._count(piece, square, 1)
+                self.locations[piece.color][piece.name].add(square)
+        # Лучи дальнобойных фигур зависят от всей расстановки, поэтому атаки считаются после нее
+        self._attacks_from = [0] * 64
+        for color, types in self.locations.items():
+            for name, squares in types.items():
+                for square in squares:
+                    self._attacks_from[square] = self._attack_mask(name, color, square)
+
+    def _attack_mask(self, name, color, square):
+        """Returns the mask of the squares a piece of the given type and color attacks from the square.
+
+        Princesses get 0: what they attack depends on the move count, so is_attacked checks them itself.
+        """
+        rays = SLIDER_RAYS.get(name)
+        if rays is None:
+            if name == 'Pawn':
+                return PAWN_ATTACK_MASKS[color][square]
+            masks = ATTACK_MASKS.get(name)
+            return masks[square] if masks is not None else 0
+        markup = self.markup
+        mask = 0
+        for ray in rays[square]:
+            for bit, col, row_index in ray:
+                mask |= bit
+                if markup[col][row_index] is not None:
+                    break
+        return mask
+
+    def _update_attacks(self, square, old, piece):
+        """Brings the attack maps up to date after _put replaced old with piece (either may be None) on the square."""
+        attacks_from = self._attacks_from
+        attacks_from[square] = 0
+        if (old is None) != (piece is None):
+            # Клетка освободилась или занята: лучи, упиравшиеся в нее или проходившие через нее, меняются
+            bit = 1 << square
+            for color, types in self.locations.items():
+                for name in SLIDER_RAYS:
+                    for slider in types[name]:
+                        if attacks_from[slider] & bit:
+                            attacks_from[slider] = self._attack_mask(name, color, slider)
+        if piece is not None:
+            attacks_from[square] = self._attack_mask(piece.name, piece.color, square)
+
+    def attacks(self, color):
+        """Returns the mask of the squares attacked by the pieces of the given color, princesses left out."""
+        attacks_from = self._attacks_from
+        mask = 0
+        for squares in self.locations[color].values():
+            for square in squares:
+                mask |= attacks_from[square]
+        return mask
+
+    def is_attacked(self, square, by):
+        """Checks whether a piece of the given color could capture on the square with its next move.
+
+        The attack maps answer for every piece but the princesses, which capture only when their side
+        moves with an even move_count, and never a queen. A princess that has eaten captures on a king
+        step and is counted here. One that has not eaten may capture anywhere, the king included, but
+        that reach is a standing threat no move could answer, so it is left out: counting it would
+        leave every king in check and every game mated after the first move.
+
+        Args:
+            square (int): Index of the square (see square_index).
+            by (str): The attacking color ('white' or 'black').
 
         Returns:
-            str: The player's turn after undoing the move.
+            bool: True if the square is attacked.
         """
+        bit = 1 << square
+        attacks_from = self._attacks_from
+        for squares in self.locations[by].values():
+            for attacker in squares:
+                if attacks_from[attacker] & bit:
+                    return True
+        princesses = self.locations[by]['Princess']
+        if not princesses:
+            return False
+        # Принцесса бьет только на четном ходу; если сейчас ходит другая сторона, ее ход будет следующим
+        next_count = self.move_count if self.turn == by else self.move_count + 1
+        if next_count % 2:
+            return False
+        col, row = SQUARES[square]
+        target = self.markup[col][row - 1]
+        if target is None or target.color == by or target.name == 'Queen':
+            return False
+        for princess_square in princesses:
+            if self.eaten >> princess_square & 1 and KING_MASKS[princess_square] >> square & 1:
+                return True
+        return False
 
-        if not self.history:
-            print("Нет ходов для отката")
-            return turn
+    def in_check(self, color):
+        """Checks whether the king of the given color is attacked (False if it has been captured)."""
+        other = 'black' if color == 'white' else 'white'
+        return any(self.is_attacked(square, other) for square in self.locations[color]['King'])
+
+    def legal_moves(self, color=None):
+        """Lists the moves of generate_moves that do not leave the mover's own king attacked.
+
+        Args:
+            color (str, optional): The color to move; board.turn by default. Moves for the other side are
+                checked as if it were its turn.
+
+        Returns:
+            list: Tuples (start, end) of (str, int) positions.
+        """
+        color = color or self.turn
+        moves = []
+        for move in self.generate_moves(color):
+            if not self.exposes_king(*move):
+                moves.append(move)
+        return moves
+
+    def exposes_king(self, start, end):
+        """Checks whether a move would leave the king of the moving piece attacked; False for a move that is not allowed."""
+        move = self.make_move(start, end)
+        if move is None:
+            return False
+        try:
+            return self.in_check(move.point.color)
+        finally:
+            self.unmake_move()
+
+    def game_state(self):
+        """Tells how the game stands for the side to move.
+
+        Returns:
+            GameState: KING_CAPTURED, CHECKMATE or STALEMATE if the game is over, CHECK or PLAYING otherwise.
+        """
+        color = self.turn
+        if not self.locations[color]['King']:
+            return GameState.KING_CAPTURED
+        check = self.in_check(color)
+        for move in self.generate_moves(color):
+            if not self.exposes_king(*move):
+                return GameState.CHECK if check else GameState.PLAYING
+        return GameState.CHECKMATE if check else GameState.STALEMATE
+
+    def has_eaten(self, square):
+        """Checks whether the princess on the square with the given index has already captured a piece."""
+        return bool(self.eaten >> square & 1)
+
+    def copy(self):
+        """Returns an independent copy of the position.
+
+        Pieces are shared flyweights and everything that changes during a game lives in the board, so only
+        the columns, counters and index sets are copied; Move records in the history are shared.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.NONE = None
+        clone.move_count = self.move_count
+        clone.turn = self.turn
+        clone.hash = self.hash
+        clone.history = list(self.history)
+        clone.markup = {col: list(column) for col, column in self.markup.items()}
+        clone.eaten = self.eaten
+        clone.material = dict(self.material)
+        clone.positional = dict(self.positional)
+        clone.piece_counts = {color: dict(counts) for color, counts in self.piece_counts.items()}
+        clone.score = self.score
+        clone.locations = {color: {name: set(squares) for name, squares in types.items()}
+                           for color, types in self.locations.items()}
+        clone._attacks_from = list(self._attacks_from)
+        clone.checkpoints = dict(self.checkpoints)
+        clone._line = list(self._line)
+        return clone
+
+    def _load(self, markup):
+        """Takes a dict of columns holding pieces or None as the board's markup."""
+        self.markup = markup
+
+    def _snapshot(self):
+        """Returns a compact snapshot of the position: the 64 squares in index order, eaten, turn, move_count and hash."""
+        markup = self.markup
+        return tuple(markup[col][row - 1] for col, row in SQUARES), self.eaten, self.turn, self.move_count, self.hash
+
+    def _restore(self, snapshot):
+        """Puts back a position saved by _snapshot and recomputes the counters and attack maps; the history is left alone."""
+        squares, self.eaten, self.turn, self.move_count, self.hash = snapshot
+        self._load({col: list(squares[index::8]) for index, col in enumerate(COLUMNS)})
+        self._reset_counters()
+
+    def _start_line(self):
+        """Makes the current position ply 0 of a new game line with its first checkpoint."""
+        self._line = []
+        self.checkpoints = {0: self._snapshot()}
+
+    def _add_checkpoint(self):
+        ply = len(self.history)
+        if ply % CHECKPOINT_INTERVAL == 0 and ply not in self.checkpoints:
+            self.checkpoints[ply] = self._snapshot()
+
+    def _sync_line(self):
+        """Brings the game line up to date with the history.
+
+        The line is the history plus the moves taken back since, which redo_moves can make again. Moves made
+        and taken back with make_move and unmake_move (e.g. by a search) leave it alone; a different move
+        made after an undo replaces the rest of the line and drops the checkpoints after the point where
+        the two lines part.
+        """
+        history, line = self.history, self._line
+        ply = len(history)
+        if ply <= len(line) and (ply == 0 or line[ply - 1] is history[-1]):
+            return
+        common = 0
+        while common < min(ply, len(line)) and line[common] is history[common]:
+            common += 1
+        self._line = list(history)
+        for checkpoint in [checkpoint for checkpoint in self.checkpoints if checkpoint > common]:
+            del self.checkpoints[checkpoint]
+
+    def goto_ply(self, ply):
+        """Moves to the position after the given number of moves of the game line, backwards or forwards.
+
+        The position is restored from the nearest checkpoint at or before the ply and only the moves after
+        it are replayed, unless walking there from the current position is cheaper.
+
+        Args:
+            ply (int): Number of moves since the start of the game (or the last setup).
+
+        Returns:
+            int: The ply reached.
 
-        last_move = self.history.pop()
+        Raises:
+            ValueError: If the game line has no such ply.
+        """
+
+        self._sync_line()
+        line = self._line
+        if not 0 <= ply <= len(line):
+            raise ValueError(f"ply {ply} is outside the game (0-{len(line)})")
+        current = len(self.history)
+        nearest = max(checkpoint for checkpoint in self.checkpoints if checkpoint <= ply)
+        if ply - nearest + CHECKPOINT_RESTORE_COST < abs(ply - current):
+            self._restore(self.checkpoints[nearest])
+            self.history = line[:nearest]
+            current = nearest
+        while current > ply:
+            self.unmake_move()
+            current -= 1
+        while current < ply:
+            # ходы линии уже проверены, когда их делали впервые
+            self._apply(line[current])
+            current += 1
+            self._add_checkpoint()
+        if self.observers:
+            self._notify('seek', ply, len(line))
+        return ply
+
+    def undo_moves(self, count):
+        """Takes back count moves at once (fewer if the game is shorter) with goto_ply; they can be redone.
 
-        start_col, start_row = last_move.start
-        end_col, end_row = last_move.end
+        Returns:
+            int: The ply reached.
+        """
+        return self.goto_ply(max(len(self.history) - count, 0))
 
-        self.markup[start_col][start_row - 1] = last_move.point
+    def redo_moves(self, count):
+        """Makes again up to count moves that were taken back, with goto_ply.
 
-        self.markup[end_col][end_row - 1] = last_move.target
+        Returns:
+            int: The ply reached.
+        """
+        self._sync_line()
+        return self.goto_ply(min(len(self.history) + count, len(self._line)))
 
-        self.markup[last_move.end[0]][last_move.end[1] - 1] = self.NONE
+    def find_pieces(self, color, name):
+        """Returns the positions of all pieces of the given color and type, in square order.
 
-        self.move_count -= 1
+        Args:
+            color (str): 'white' or 'black'.
+            name (str): A piece type from FIGURE_NAMES, e.g. 'Magnet'.
 
-        print(f"Откат хода: {end_col}{end_row} -> {start_col}{start_row}")
-        self.draw_board()
+        Returns:
+            list: (str, int) positions.
+        """
+        return [SQUARES[square] for square in sorted(self.locations[color][name])]
+
+    def find_king(self, color):
+        """Returns the (str, int) position of the king of the given color, or None if it has been captured."""
+        kings = self.locations[color]['King']
+        if not kings:
+            return None
+        return SQUARES[min(kings)]
+
+    def _advance(self, step):
+        """Changes move_count by step (1 or -1) and passes the turn to the other side."""
+        self.move_count += step
+        self.turn = 'black' if self.turn == 'white' else 'white'
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE ^ ZOBRIST_ODD_MOVE
+
+    def compute_hash(self):
+        """Computes the Zobrist hash of the position from scratch.
+
+        Returns:
+            int: A 64-bit hash that move_figure and undo_move keep up to date incrementally.
+        """
+        value = 0
+        for square, (col, row) in enumerate(SQUARES):
+            piece = self.markup[col][row - 1]
+            if piece is not None:
+                value ^= zobrist_key(piece, square, self.eaten >> square & 1)
+        if self.turn == 'black':
+            value ^= ZOBRIST_BLACK_TO_MOVE
+        if self.move_count % 2 == 1:
+            value ^= ZOBRIST_ODD_MOVE
+        return value
+
+    def generate_moves(self, color):
+        """Lists every legal move of the pieces of the given color.
+
+        Only the squares in the location index are visited, and destinations come from the jump and ray
+        tables built at import time, so only reachable squares are inspected.
+
+        Args:
+            color (str): The color whose moves are listed ('white' or 'black').
+
+        Returns:
+            list: Tuples (start, end) of (str, int) positions, each accepted by move_figure.
+        """
+
+        moves = []
+        markup = self.markup
+        for squares in self.locations[color].values():
+            # по возрастанию номера клетки, чтобы порядок ходов зависел только от позиции
+            for square in sorted(squares):
+                start = SQUARES[square]
+                for end in markup[start[0]][start[1] - 1].destinations(square, self):
+                    moves.append((start, end))
+        return moves
+
+    def undo_move(self, turn):
+        """Reverts the last move and restores the board state.
+
+        Args:
+            turn (str): The current player's turn ('white' or 'black').
+
+        Returns:
+            str: The player's turn after undoing the move.
+        """
+
+        last_move = self.unmake_move()
+        if self.observers:
+            self._notify('undo', last_move)
+        if last_move is None:
+            return turn
 
         if turn == 'white':
             turn = 'black'
@@ -180,17 +855,58 @@ class Board:
             turn = 'white'
         return turn
 
-    def Whose_move(self):
-        """Main game loop that alternately requests moves from the players."""
+    def Whose_move(self, ai=None, ai_color='black'):
+        """Main game loop that alternately requests moves from the players.
+
+        The console front end (console.ChessConsole) is subscribed for the duration of the game.
+
+        Args:
+            ai (Engine, optional): Computer player; any object with a choose_move(board) method works.
+            ai_color (str): The side played by the computer when ai is given.
+        """
+
+        console = ChessConsole()
+        self.subscribe(console)
+        try:
+            self._play(ai, ai_color)
+        finally:
+            self.unsubscribe(console)
+
+    def _play(self, ai, ai_color):
+        """Runs the game loop of Whose_move until mate, stalemate, a captured king or an empty input line."""
 
-        turn = 'white'  # Начинают белые
         while True:
+            turn = self.turn  # Начинают белые; откат хода через undo тоже меняет очередь
             if turn == 'white':
                 print(f"Ход белых, сделано ходов: {self.move_count}")
             else:
                 print(f"Ход черных, сделано ходов: {self.move_count}")
 
             self.draw_board()
+            state = self.game_state()
+            winner = 'черные' if turn == 'white' else 'белые'
+            if state == GameState.CHECK:
+                print("Шах!")
+            elif state != GameState.PLAYING:
+                if state == GameState.CHECKMATE:
+                    print(f"Мат! Победили {winner}.")
+                elif state == GameState.KING_CAPTURED:
+                    print(f"Король взят! Победили {winner}.")
+                else:
+                    print("Пат. Ничья.")
+                print(f"Всего сделано ходов: {self.move_count}")
+                break
+            if ai is not None and turn == ai_color:
+                move = ai.choose_move(self)
+                if move is None:
+                    print("Компьютеру некуда ходить. Игра завершена.")
+                    print(f"Всего сделано ходов: {self.move_count}")
+                    break
+                (start_col, start_row), (end_col, end_row) = move
+                print(f"Компьютер ходит: {start_col}{start_row} -> {end_col}{end_row}")
+                self.move_figure(*move)
+                continue
+
             start = self.get_position(turn)
             if start == '':
                 print("Игра завершена.")
@@ -203,15 +919,17 @@ class Board:
                 print(f"Всего сделано ходов: {self.move_count}")
                 break
 
-            if self.move_figure(start, end):
-                if turn == 'white':
-                    turn = 'black'
-                else:
-                    turn = 'white'
+            if self.exposes_king(start, end):
+                print("Так ходить нельзя: король останется под боем.")
+                continue
+            self.move_figure(start, end)
 
     def get_position(self, turn):
         """Prompts the player to input the coordinates of the piece to move.
 
+        Besides coordinates the player can enter undo (take back one move), undo N and redo N (take back
+        or make again N moves) and goto N (go to the position after move N of the game).
+
         Args:
             turn (str): The player's turn ('white' or 'black').
 
@@ -222,12 +940,32 @@ class Board:
         while True:
             # user_input = input(f"Введите координаты фигуры :  {'белых' if turn == 'white' else 'черных'} (например, 'a2'): ")
             if turn == 'white':
-                user_input = input(f'Введите координаты фигуры Белых, например (a,2) или undo (откат) : ')
+                user_input = input(f'Введите координаты фигуры Белых, например (a,2) или undo [N], redo [N], goto N (откат) : ')
             else:
-                user_input = input(f'Введите координаты фигуры  Черных, например (a,2)  или undo (откат) : ')
+                user_input = input(f'Введите координаты фигуры  Черных, например (a,2)  или undo [N], redo [N], goto N (откат) : ')
             if user_input == 'undo':
                 turn = self.undo_move(turn)
                 continue
+            command = user_input.split()
+            if command and command[0] in ('undo', 'redo', 'goto'):
+                if len(command) == 1 and command[0] == 'redo':
+                    command.append('1')
+                if len(command) != 2 or not command[1].isdigit():
+                    print("после undo и redo можно указать число ходов, после goto - номер хода, например goto 10")
+                    continue
+                number = int(command[1])
+                try:
+                    if command[0] == 'undo':
+                        self.undo_moves(number)
+                    elif command[0] == 'redo':
+                        self.redo_moves(number)
+                    else:
+                        self.goto_ply(number)
+                except ValueError:
+                    print(f"в партии нет хода {number}")
+                    continue
+                turn = self.turn
+                continue
 
             if len(user_input) == 0:
                 return ''
@@ -252,7 +990,11 @@ class Move:
         start (tuple): The starting position of the piece.
         end (tuple): The ending position of the piece.
         point (Figure): The piece that was moved.
-        target (Figure): The piece that was captured (if any).
+        target (Figure): The piece that was captured or pulled (if any).
+        eaten (bool): Whether this was the princess's first capture, which set her bit in Board.eaten.
+        point_eaten (bool): Whether the moved piece was a princess that had already eaten.
+        target_eaten (bool): Whether the captured or pulled piece was a princess that had already eaten.
+        pulled_to (tuple): The (str, int) position a magnet pulled the target to, or None.
     """
 
     def __init__(self, start, end, point, target):
@@ -260,11 +1002,19 @@ class Move:
         self.end = end
         self.point = point
         self.target = target
+        self.eaten = False
+        self.point_eaten = False
+        self.target_eaten = False
+        self.pulled_to = None
 
 
 class Figure:
     """Base class for all chess pieces.
 
+    Pieces are immutable flyweights: Pawn('white') returns the same object every time, so boards share
+    their pieces and copying a board never copies one. State that changes during a game, such as whether
+    a princess has eaten, is kept by the Board.
+
     Attributes:
         name (str): The name of the piece.
         color (str): The color of the piece ('white' or 'black').
@@ -273,9 +1023,26 @@ class Figure:
         can_move(start, end, board=None): Checks if the piece can move from the starting position to the ending position.
     """
 
+    __slots__ = ('name', 'color')
+    _instances = {}
+
+    def __new__(cls, color):
+        piece = Figure._instances.get((cls, color))
+        if piece is None:
+            piece = Figure._instances[cls, color] = super().__new__(cls)
+        return piece
+
     def __init__(self, name, color):
-        self.name = name
-        self.color = color
+        # __init__ runs again on every Pawn('white'), but always with the same values
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'color', color)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.name} pieces are shared between boards and cannot be changed")
+
+    def __reduce__(self):
+        # pickle and copy give back the shared piece instead of a new object
+        return self.__class__, (self.color,)
 
     def can_move(self, start, end):
         """
@@ -291,6 +1058,40 @@ class Figure:
 
         pass
 
+    def destinations(self, square, board):
+        """Lists the positions the piece can move to from the given square.
+
+        Args:
+            square (int): Index of the piece's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return []
+
+    def _free_or_enemy(self, positions, board):
+        """Keeps the positions that are empty or occupied by an enemy piece."""
+        markup = board.markup
+        return [end for end in positions
+                if markup[end[0]][end[1] - 1] is None or markup[end[0]][end[1] - 1].color != self.color]
+
+    def _slide(self, rays, board):
+        """Collects the positions along the given rays up to the first piece, which is included if it is an enemy."""
+        markup = board.markup
+        ends = []
+        for ray in rays:
+            for end in ray:
+                target = markup[end[0]][end[1] - 1]
+                if target is None:
+                    ends.append(end)
+                    continue
+                if target.color != self.color:
+                    ends.append(end)
+                break
+        return ends
+
 
 class Pawn(Figure):
     """Represents a pawn.
@@ -298,6 +1099,8 @@ class Pawn(Figure):
     Inherits from Figure and overrides the can_move method to implement pawn movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__("Pawn", color)
 
@@ -323,6 +1126,28 @@ class Pawn(Figure):
             return (start_row - 1 == end_row and start_col == end_col) or (
                     start_row == 6 and end_row == 4 and start_col == end_col)
 
+    def destinations(self, square, board):
+        """Lists the positions the pawn can move to from the given square.
+
+        Args:
+            square (int): Index of the pawn's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        col, row = SQUARES[square]
+        if self.color == 'white':
+            ends = [(col, row + 1)] if row < 8 else []
+            if row == 1:
+                ends.append((col, 3))
+        else:
+            ends = [(col, row - 1)] if row > 1 else []
+            if row == 6:
+                ends.append((col, 4))
+        return self._free_or_enemy(ends, board)
+
     def __str__(self):
         """Returns the string representation of the pawn.
 
@@ -339,6 +1164,8 @@ class Rook(Figure):
     Inherits from Figure and overrides the can_move method to implement rook movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__('Rook', color)
 
@@ -356,7 +1183,22 @@ class Rook(Figure):
 
         start_row, start_col = start
         end_row, end_col = end
-        return start_row == end_row or start_col == end_col
+        if start_row != end_row and start_col != end_col:
+            return False
+        return board is None or board.path_clear(square_index(start_col, start_row), square_index(end_col, end_row))
+
+    def destinations(self, square, board):
+        """Lists the positions the rook can move to from the given square.
+
+        Args:
+            square (int): Index of the rook's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._slide(ORTHOGONAL_RAYS[square], board)
 
     def __str__(self):
         """Returns the string representation of the rook.
@@ -374,6 +1216,8 @@ class Bishop(Figure):
     Inherits from Figure and overrides the can_move method to implement bishop movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__('Bishop', color)
 
@@ -393,7 +1237,22 @@ class Bishop(Figure):
         end_row, end_col = end
         start_col_num = ord(start_col) - ord('a')
         end_col_num = ord(end_col) - ord('a')
-        return abs(start_row - end_row) == abs(start_col_num - end_col_num)
+        if abs(start_row - end_row) != abs(start_col_num - end_col_num):
+            return False
+        return board is None or board.path_clear(square_index(start_col, start_row), square_index(end_col, end_row))
+
+    def destinations(self, square, board):
+        """Lists the positions the bishop can move to from the given square.
+
+        Args:
+            square (int): Index of the bishop's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._slide(DIAGONAL_RAYS[square], board)
 
     def __str__(self):
         """Returns the string representation of the bishop.
@@ -411,6 +1270,8 @@ class Knight(Figure):
     Inherits from Figure and overrides the can_move method to implement knight movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__('Knight', color)
 
@@ -433,6 +1294,19 @@ class Knight(Figure):
         return ((abs(start_row - end_row) == 2 and abs(start_col_num - end_col_num) == 1) or (
                 abs(start_row - end_row) == 1 and abs(start_col_num - end_col_num) == 2))
 
+    def destinations(self, square, board):
+        """Lists the positions the knight can move to from the given square.
+
+        Args:
+            square (int): Index of the knight's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._free_or_enemy(KNIGHT_JUMPS[square], board)
+
     def __str__(self):
         """Returns the string representation of the knight.
 
@@ -448,6 +1322,8 @@ class King(Figure):
     Inherits from Figure and overrides the can_move method to implement king movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__('King', color)
 
@@ -468,6 +1344,19 @@ class King(Figure):
         end_col_num = ord(end_col) - ord('a')
         return abs(start_row - end_row) <= 1 and abs(start_col_num - end_col_num) <= 1
 
+    def destinations(self, square, board):
+        """Lists the positions the king can move to from the given square.
+
+        Args:
+            square (int): Index of the king's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._free_or_enemy(KING_STEPS[square], board)
+
     def __str__(self):
         """Returns the string representation of the king.
 
@@ -483,6 +1372,8 @@ class Queen(Figure):
     Inherits from Figure and overrides the can_move method to implement queen movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__('Queen', color)
 
@@ -503,12 +1394,23 @@ class Queen(Figure):
         start_col_num = ord(start_col) - ord('a')
         end_col_num = ord(end_col) - ord('a')
 
-        if start_row == end_row or start_col_num == end_col_num:
-            return True
-        elif abs(start_row - end_row) == abs(start_col_num - end_col_num):
-            return True
-        else:
+        straight = start_row == end_row or start_col_num == end_col_num
+        if not straight and abs(start_row - end_row) != abs(start_col_num - end_col_num):
             return False
+        return board is None or board.path_clear(square_index(start_col, start_row), square_index(end_col, end_row))
+
+    def destinations(self, square, board):
+        """Lists the positions the queen can move to from the given square.
+
+        Args:
+            square (int): Index of the queen's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._slide(QUEEN_RAYS[square], board)
 
     def __str__(self):
         """Returns the string representation of the queen.
@@ -525,6 +1427,8 @@ class Magnet(Figure):
     Inherits from Figure and overrides the can_move method to implement magnet movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__("Magnet", color)
 
@@ -553,10 +1457,37 @@ class Magnet(Figure):
             col_diff = abs(start_col_num - end_col_num)
             if (row_diff == 0 or col_diff == 0 or row_diff == col_diff) and max(row_diff, col_diff) <= 5:
                 target = board.markup[end_col][end_row - 1]
-                if target != board.NONE and target.color != self.color:
-                    return True
-                else:
+                if target == board.NONE or target.color == self.color:
                     return False
+                # Все клетки между магнитом и целью, кроме той, куда цель притянется, должны быть пусты;
+                # занятую клетку притягивания Board сообщает отдельно (PULL_SQUARE_OCCUPIED)
+                between = BETWEEN_SQUARES[square_index(start_col, start_row)][square_index(end_col, end_row)]
+                return all(board.markup[col][row - 1] is None for col, row in between[:-1])
+
+    def destinations(self, square, board):
+        """Lists the positions the magnet can move to from the given square.
+
+        Args:
+            square (int): Index of the magnet's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        ends = self._free_or_enemy(KING_STEPS[square], board)
+        markup = board.markup
+        for ray in QUEEN_RAYS[square]:
+            # ray[1:5] are the squares two to five steps away, ray[distance - 1] is where the target gets pulled.
+            # Only the first piece on the ray can be pulled, and only if it is an enemy.
+            for distance in range(min(len(ray), 5)):
+                end_col, end_row = ray[distance]
+                target = markup[end_col][end_row - 1]
+                if target is not None:
+                    if distance > 0 and target.color != self.color:
+                        ends.append(ray[distance])
+                    break
+        return ends
 
     def __str__(self):
         """Returns the string representation of the magnet.
@@ -573,6 +1504,8 @@ class Kangaroo(Figure):
     Inherits from Figure and overrides the can_move method to implement kangaroo movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__("Kangaroo", color)
 
@@ -600,6 +1533,19 @@ class Kangaroo(Figure):
         else:
             return False
 
+    def destinations(self, square, board):
+        """Lists the positions the kangaroo can move to from the given square.
+
+        Args:
+            square (int): Index of the kangaroo's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        return self._free_or_enemy(KANGAROO_JUMPS[square], board)
+
     def __str__(self):
         """Returns the string representation of the kangaroo.
 
@@ -615,13 +1561,14 @@ class Princess(Figure):
     Inherits from Figure and overrides the can_move method to implement princess movement rules.
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
         super().__init__("Princess", color)
-        self.has_eaten = False
 
-    def can_eat_enemy(self, target):
-        """Checks if the princess can capture an enemy piece."""
-        if self.has_eaten:
+    def can_eat_enemy(self, target, has_eaten=False):
+        """Checks if the princess can capture an enemy piece; has_eaten is her flag from Board.has_eaten."""
+        if has_eaten:
             return False
         elif target is None:
             return False
@@ -654,17 +1601,44 @@ class Princess(Figure):
         start_col_num = ord(start_col) - ord('a')
         end_col_num = ord(end_col) - ord('a')
         target = board.markup[end_col][end_row - 1]
+        has_eaten = board.has_eaten(square_index(start_col, start_row))
 
-        if self.can_eat_enemy(target):
+        if self.can_eat_enemy(target, has_eaten):
             return True
 
-        if self.has_eaten == True:
+        if has_eaten:
             if board.move_count % 2 == 0:
                 if self.can_move_like_king(start_row, start_col_num, end_row, end_col_num):
                     return True
 
         return False
 
+    def destinations(self, square, board):
+        """Lists the positions the princess can move to from the given square.
+
+        Args:
+            square (int): Index of the princess's square (see square_index).
+            board (Board): The board on which the move is being made.
+
+        Returns:
+            list: Positions (str, int) that Board.move_figure accepts as the end of the move.
+        """
+
+        if board.move_count % 2 != 0:
+            return []
+        markup = board.markup
+        ends = []
+        if not board.has_eaten(square):
+            for end in SQUARES:
+                if self.can_eat_enemy(markup[end[0]][end[1] - 1]):
+                    ends.append(end)
+        else:
+            for end in KING_STEPS[square]:
+                target = markup[end[0]][end[1] - 1]
+                if target is None or (target.color != self.color and target.name != "Queen"):
+                    ends.append(end)
+        return ends
+
     def __str__(self):
         """Returns the string representation of the princess.
 
@@ -674,9 +1648,8 @@ class Princess(Figure):
         return self.name[2]
 
 
-board = Board()
-
 if __name__ == "__main__":
+    board = Board()
     print("Доска до хода:")
     board.draw_board()
 
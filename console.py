@@ -0,0 +1,71 @@
+from events import IllegalMove
+
+
+class ChessConsole:
+    """Console front end of chessboard.Board: prints the outcome of every move and undo and redraws the board."""
+
+    MESSAGES = {
+        IllegalMove.NO_PIECE: "Фигуры тут нет",
+        IllegalMove.AGAINST_RULES: "Не допустимый ход",
+        IllegalMove.PULL_SQUARE_OCCUPIED: "Клетка для притягивания занята",
+        IllegalMove.PRINCESS_CANNOT_EAT_QUEEN: "Принцесса не может съесть королеву!",
+        IllegalMove.PRINCESS_ODD_MOVE: "Принцесса может съедать фигуры только на четных ходах!",
+        IllegalMove.OWN_PIECE: "вы решили убить свою фигуру (партизан)",
+    }
+
+    def on_move(self, board, result):
+        if not result:
+            if result.reason == IllegalMove.OWN_PIECE and result.piece.name == "Princess":
+                print("Вы пытаетесь съесть свою фигуру!")
+            else:
+                print(self.MESSAGES[result.reason])
+            return
+
+        start_col, start_row = result.move.start
+        end_col, end_row = result.move.end
+        if result.pulled is not None:
+            new_col, new_row = result.move.pulled_to
+            print(f"Фигура {result.pulled} притянута к {new_col}{new_row}")
+        elif result.piece.name == "Princess" and result.captured is not None:
+            print(f"Принцесса съела фигуру {result.captured}")
+        else:
+            if result.captured is not None:
+                print(f"Фигуру {result.captured} съели")
+            print(f"Ход выполнен успешно: {start_col}{start_row} -> {end_col}{end_row}")
+        board.draw_board()
+
+    def on_undo(self, board, move):
+        if move is None:
+            print("Нет ходов для отката")
+            return
+        start_col, start_row = move.start
+        end_col, end_row = move.end
+        print(f"Откат хода: {end_col}{end_row} -> {start_col}{start_row}")
+        board.draw_board()
+
+    def on_seek(self, board, ply, line_length):
+        print(f"Позиция после хода {ply} из {line_length}")
+        board.draw_board()
+
+
+class CheckersConsole:
+    """Console front end of checker.Board1."""
+
+    MESSAGES = {
+        IllegalMove.NOT_YOUR_PIECE: "Здесь нет вашей шашки.",
+        IllegalMove.AGAINST_RULES: "Недопустимый ход.",
+        IllegalMove.OWN_PIECE: "Нельзя съесть свою шашку.",
+        IllegalMove.NOTHING_TO_JUMP: "Невозможно съесть шашку.",
+        IllegalMove.MUST_CAPTURE: "Бить обязательно!",
+        IllegalMove.MUST_CONTINUE_JUMP: "Взятие не закончено: укажите клетку, где шашка закончит ход.",
+    }
+
+    def on_move(self, board, result):
+        if not result:
+            print(self.MESSAGES[result.reason])
+            return
+        for checker in result.captured:
+            print(f"Шашка {checker} съедена.")
+        start_col, start_row = result.move.start
+        end_col, end_row = result.move.end
+        print(f"Ход выполнен: {start_col}{start_row} -> {end_col}{end_row}")
@@ -0,0 +1,415 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from chessboard import PIECE_VALUES
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+MATE = 1000000
+# Scores beyond MATE_BOUND mean a king gets captured; the table stores them relative to the node, not the root.
+MATE_BOUND = MATE - 1000
+INFINITY = MATE + 1
+MAX_DEPTH = 64
+# The search looks at the clock, the node limit and the stop event once every this many nodes (a power of two).
+CHECK_INTERVAL = 256
+# ParallelEngine checks its stop event, clock and node limit this often (seconds) while the workers search.
+POLL_INTERVAL = 0.01
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
+
+class SearchResult:
+    """Outcome of Engine.search.
+
+    Attributes:
+        move (tuple): The best move as (start, end) positions accepted by Board.move_figure, or None.
+        score (int): Evaluation in centipawns from the point of view of the side to move.
+        depth (int): The deepest fully completed iteration.
+        pv (list): The principal variation: the best line of moves, starting with move.
+        nodes (int): Number of positions visited.
+        seconds (float): Time spent on the search.
+    """
+
+    def __init__(self, move, score, depth, pv, nodes, seconds):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, seconds={self.seconds:.3f})")
+
+
+def evaluate(board):
+    """Returns material plus piece-square bonuses in centipawns from the point of view of the side to move.
+
+    Board keeps the total up to date on every move, so this is a field read.
+    """
+    return board.score if board.turn == 'white' else -board.score
+
+
+def _captures_king(move):
+    return move.target is not None and move.pulled_to is None and move.target.name == 'King'
+
+
+class Engine:
+    """Computer player: iterative deepening alpha-beta (negamax) search with a transposition table.
+
+    Capturing the king ends the game, so such a move scores as a win at once, and so does any position
+    where the side to move attacks the enemy king (a lookup in the board's attack maps). A side whose
+    every move gives its king away while the king is not in check is stalemated, which scores 0.
+    Transposition table cutoffs are only taken from entries searched to exactly the same depth, which
+    keeps the result of a search to a given depth independent of what the table remembers from earlier
+    searches.
+
+    Attributes:
+        depth (int): Default depth limit, or None.
+        time_limit (float): Default time budget in seconds, or None.
+        tt (TranspositionTable): Results shared between iterations and searches.
+        book (opening_book.OpeningBook): Book consulted by choose_move before searching, or None.
+        nodes (int): Positions visited by the last search.
+    """
+
+    def __init__(self, depth=None, time_limit=None, tt_size=1 << 18, book=None):
+        """Creates an engine.
+
+        Args:
+            depth (int, optional): Default depth limit.
+            time_limit (float, optional): Default time budget in seconds. Without either limit the engine searches 3 moves deep.
+            tt_size (int): Number of transposition table slots.
+            book (opening_book.OpeningBook, optional): Opening book to play from while it knows the position.
+        """
+        self.depth = depth
+        self.time_limit = time_limit
+        self.tt = TranspositionTable(tt_size)
+        self.book = book
+        self.nodes = 0
+        self._deadline = None
+        self._node_limit = None
+        self._stop = None
+        self._pv = [[] for _ in range(MAX_DEPTH + 2)]
+
+    def choose_move(self, board):
+        """Returns a book move or else the best move for board.turn with the default limits; None if there is no move."""
+        if self.book is not None:
+            move = self.book.choose(board)
+            if move is not None:
+                return move
+        return self.search(board).move
+
+    def search(self, board, depth=None, time_limit=None, nodes=None, stop=None, on_iteration=None):
+        """Searches the position for the side to move (board.turn).
+
+        The board is changed during the search and restored before returning.
+
+        Args:
+            board (Board): The position to analyse.
+            depth (int, optional): Maximum depth; overrides the engine's default.
+            time_limit (float, optional): Time budget in seconds; overrides the engine's default. The first
+                iteration always completes, so a move is returned even with a tiny budget.
+            nodes (int, optional): Node budget, counted like time_limit from the second iteration on.
+            stop (threading.Event, optional): Setting it from another thread ends the search within
+                CHECK_INTERVAL nodes, even during the first iteration; the first root move is returned then
+                if no iteration has completed.
+            on_iteration (callable, optional): Called with the SearchResult of every completed iteration.
+
+        Returns:
+            SearchResult: The result of the deepest completed iteration.
+        """
+        depth = depth or self.depth
+        time_limit = time_limit or self.time_limit
+        if depth is None and time_limit is None and nodes is None and stop is None:
+            depth = 3
+        max_depth = min(depth or MAX_DEPTH, MAX_DEPTH)
+        started = time.perf_counter()
+        self.nodes = 0
+        self.tt.new_search()
+
+        root_moves = board.generate_moves(board.turn)
+        result = SearchResult(None, 0, 0, [], 0, 0.0)
+        if not root_moves:
+            return result
+
+        history_length = len(board.history)
+        self._stop = stop
+        try:
+            for iteration in range(1, max_depth + 1):
+                self._deadline = started + time_limit if time_limit and iteration > 1 else None
+                self._node_limit = nodes if nodes and iteration > 1 else None
+                try:
+                    score, pv = self._search_root(board, root_moves, iteration)
+                except SearchTimeout:
+                    while len(board.history) > history_length:
+                        board.unmake_move()
+                    break
+                result = SearchResult(pv[0], score, iteration, pv, self.nodes, time.perf_counter() - started)
+                if on_iteration is not None:
+                    on_iteration(result)
+                root_moves.remove(pv[0])
+                root_moves.insert(0, pv[0])
+                if abs(score) >= MATE_BOUND:
+                    break
+        finally:
+            self._stop = None
+            self._deadline = self._node_limit = None
+        if result.move is None:
+            # Stopped before the first iteration completed: any move beats none
+            result = SearchResult(root_moves[0], 0, 0, [root_moves[0]], 0, 0.0)
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _out_of_budget(self):
+        if self._stop is not None and self._stop.is_set():
+            return True
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            return True
+        return self._node_limit is not None and self.nodes >= self._node_limit
+
+    def _search_root(self, board, moves, depth):
+        """Searches every root move in the given order; the first move reaching the best score wins."""
+        alpha = -INFINITY
+        best_pv = None
+        self._pv[0] = []
+        for move in moves:
+            made = board.make_move(*move)
+            if _captures_king(made):
+                score = MATE - 1
+                self._pv[1] = []
+            else:
+                score = -self._negamax(board, depth - 1, -INFINITY, -alpha, 1)
+            board.unmake_move()
+            if score > alpha:
+                alpha = score
+                best_pv = [move] + self._pv[1]
+        if alpha == -(MATE - 2) and not board.in_check(board.turn):
+            alpha = 0
+        return alpha, best_pv
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        """Returns the score of the position for the side to move, searched depth moves deep."""
+        self.nodes += 1
+        if self.nodes & (CHECK_INTERVAL - 1) == 0 and self._out_of_budget():
+            raise SearchTimeout()
+        self._pv[ply] = []
+        # The enemy king is attacked: taking it next move wins, so there is nothing left to search
+        if board.in_check('black' if board.turn == 'white' else 'white'):
+            return MATE - ply - 1
+        if depth == 0:
+            return evaluate(board)
+
+        original_alpha = alpha
+        tt_move = None
+        entry = self.tt.probe(board.hash)
+        if entry is not None:
+            entry_depth, value, flag, tt_move = entry
+            if entry_depth == depth:
+                value = _score_from_table(value, ply)
+                if flag == EXACT:
+                    if tt_move is not None:
+                        self._pv[ply] = [tt_move]
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        moves = board.generate_moves(board.turn)
+        if not moves:
+            return 0
+        self._order(board, moves, tt_move)
+
+        best = -INFINITY
+        best_move = None
+        for move in moves:
+            made = board.make_move(*move)
+            if _captures_king(made):
+                score = MATE - ply - 1
+                self._pv[ply + 1] = []
+            else:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if alpha >= beta:
+                        break
+
+        # Every move lets the king be taken: that is mate only if the king is attacked already
+        if best == -(MATE - ply - 2) and best < beta and not board.in_check(board.turn):
+            best = 0
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(board.hash, depth, _score_to_table(best, ply), flag, best_move)
+        return best
+
+    def _order(self, board, moves, first=None):
+        """Sorts moves in place: the remembered best move first, then moves onto the most valuable pieces."""
+        markup = board.markup
+
+        def key(move):
+            if move == first:
+                return -INFINITY
+            end_col, end_row = move[1]
+            target = markup[end_col][end_row - 1]
+            return -PIECE_VALUES[target.name] if target is not None else 0
+
+        moves.sort(key=key)
+
+
+def _score_to_table(score, ply):
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class ParallelEngine(Engine):
+    """Engine that splits the root moves of every iteration across a pool of worker processes.
+
+    Workers share the best score found so far at the root, so moves searched later are cut off as in the
+    serial search. Every worker searches with a window one point below that score, which yields exact
+    scores for all moves that tie the best one; the first of them in root order is chosen, exactly as
+    the serial Engine does, so both return the same move and score at the same depth.
+
+    The time budget is an absolute wall-clock deadline shared by every root move. When the budget runs
+    out or stop is set, the moves still queued are cancelled and the running ones are told to stop
+    through an event the workers poll like the serial search polls stop.
+
+    Attributes:
+        workers (int): Number of worker processes.
+    """
+
+    def __init__(self, depth=None, time_limit=None, tt_size=1 << 18, workers=None, book=None):
+        """Creates the engine and starts its worker processes.
+
+        Args:
+            depth (int, optional): Default depth limit.
+            time_limit (float, optional): Default time budget in seconds.
+            tt_size (int): Number of transposition table slots in every worker.
+            workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+            book (opening_book.OpeningBook, optional): Opening book to play from while it knows the position.
+        """
+        super().__init__(depth, time_limit, tt_size, book)
+        self.workers = workers or os.cpu_count() or 1
+        self._alpha = multiprocessing.Value('q', -INFINITY)
+        self._halt = multiprocessing.Event()
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(self._alpha, self._halt, tt_size))
+
+    def close(self):
+        """Stops the worker processes."""
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _search_root(self, board, moves, depth):
+        """Searches the root moves in the worker processes and picks the best one as the serial search would."""
+        self._alpha.value = -INFINITY
+        self._halt.clear()
+        # A task starts only when a worker is free, so all of them get the same deadline on the wall clock
+        deadline = None if self._deadline is None else time.time() + (self._deadline - time.perf_counter())
+        position = board.copy()
+        # The workers only search: the game line and its checkpoints would just be pickled for nothing
+        position.history = []
+        position._line = []
+        position.checkpoints = {}
+        futures = [self._pool.submit(_search_root_move, position, move, depth, deadline) for move in moves]
+        pending = futures
+        while pending:
+            pending = wait(pending, POLL_INTERVAL).not_done
+            if pending and self._out_of_budget():
+                # Out of budget: the moves still queued are dropped and the running ones are told to stop
+                self._halt.set()
+                for future in pending:
+                    future.cancel()
+                break
+        results = []
+        for future in futures:
+            if future.cancelled():
+                results.append(None)
+                continue
+            result, nodes = future.result()
+            self.nodes += nodes
+            results.append(result)
+        if None in results:
+            raise SearchTimeout()
+        best = max(range(len(results)), key=lambda index: (results[index][0], -index))
+        score, pv = results[best]
+        if score == -(MATE - 2) and not board.in_check(board.turn):
+            score = 0
+        return score, pv
+
+
+_worker_engine = None
+_shared_alpha = None
+
+
+def _init_worker(shared_alpha, halt, tt_size):
+    global _worker_engine, _shared_alpha
+    _worker_engine = Engine(tt_size=tt_size)
+    _worker_engine._stop = halt
+    _shared_alpha = shared_alpha
+
+
+def _search_root_move(board, move, depth, deadline):
+    """Searches one root move in a worker process.
+
+    Args:
+        deadline (float): time.time() at which the search has to end, or None.
+
+    Returns:
+        tuple: ((score, pv), nodes), or (None, nodes) if the time ran out or the search was stopped.
+    """
+    engine = _worker_engine
+    if engine._stop.is_set():
+        return None, 0
+    engine.nodes = 0
+    engine._deadline = None
+    if deadline is not None:
+        seconds_left = deadline - time.time()
+        if seconds_left <= 0:
+            return None, 0
+        engine._deadline = time.perf_counter() + seconds_left
+    alpha = _shared_alpha.value
+    made = board.make_move(*move)
+    try:
+        if _captures_king(made):
+            score, pv = MATE - 1, []
+        else:
+            score = -engine._negamax(board, depth - 1, -INFINITY, -(alpha - 1), 1)
+            pv = engine._pv[1]
+    except SearchTimeout:
+        return None, engine.nodes
+    with _shared_alpha.get_lock():
+        if score > _shared_alpha.value:
+            _shared_alpha.value = score
+    return (score, [move] + pv), engine.nodes
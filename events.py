@@ -0,0 +1,86 @@
+from enum import Enum
+
+
+class IllegalMove(Enum):
+    """Why a move was refused."""
+
+    NO_PIECE = 'no_piece'  # the starting square is empty
+    NOT_YOUR_PIECE = 'not_your_piece'  # checkers: the starting square holds no checker of the player
+    AGAINST_RULES = 'against_rules'  # the piece cannot move like that
+    OWN_PIECE = 'own_piece'  # the ending square holds a piece of the same color
+    PULL_SQUARE_OCCUPIED = 'pull_square_occupied'  # a magnet's target has nowhere to be pulled to
+    PRINCESS_CANNOT_EAT_QUEEN = 'princess_cannot_eat_queen'
+    PRINCESS_ODD_MOVE = 'princess_odd_move'  # a princess captures only while move_count is even
+    NOTHING_TO_JUMP = 'nothing_to_jump'  # checkers: no enemy checker to jump over
+    MUST_CAPTURE = 'must_capture'  # checkers: a capture is available, so a quiet move is not allowed
+    MUST_CONTINUE_JUMP = 'must_continue_jump'  # checkers: the capture chain goes on past the given square
+    KING_LEFT_ATTACKED = 'king_left_attacked'  # chess: front ends that forbid it refuse moves exposing the own king
+
+
+class GameState(Enum):
+    """How a chess game stands for the side to move (see chessboard.Board.game_state)."""
+
+    PLAYING = 'playing'
+    CHECK = 'check'  # the king is attacked but some move saves it
+    CHECKMATE = 'checkmate'  # the king is attacked and every move leaves it attacked
+    STALEMATE = 'stalemate'  # the king is safe but every move would expose it
+    KING_CAPTURED = 'king_captured'  # the previous move took the king
+
+
+class MoveResult:
+    """Outcome of Board.move_figure or Board1.move_figure.
+
+    Evaluates to True if the move was made, so it can be used wherever a bool was returned before.
+
+    Attributes:
+        ok (bool): Whether the move was made.
+        reason (IllegalMove): Why the move was refused, or None.
+        move: The Move (or checker.CheckerMove) that was made, or None.
+        piece: The piece on the starting square, or None.
+        captured: The piece removed from the board by the move, or None; for checkers a tuple of the
+            checkers taken, since one move can jump several.
+        pulled: The piece a magnet pulled towards itself, or None.
+    """
+
+    def __init__(self, ok, reason=None, move=None, piece=None, captured=None, pulled=None):
+        self.ok = ok
+        self.reason = reason
+        self.move = move
+        self.piece = piece
+        self.captured = captured
+        self.pulled = pulled
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        if self.ok:
+            return f"MoveResult(ok=True, captured={self.captured}, pulled={self.pulled})"
+        return f"MoveResult(ok=False, reason={self.reason})"
+
+
+class Observable:
+    """Lets front ends subscribe to what happens on a board.
+
+    An observer is any object; for an event 'name' its method on_name(board, ...) is called if it has one.
+    Boards send 'move' with a MoveResult and 'undo' with the Move taken back (None if there was none);
+    chessboard.Board also sends 'seek' with the ply reached and the length of the game line after
+    goto_ply, undo_moves and redo_moves.
+    Without subscribers nothing is formatted or printed.
+    """
+
+    observers = ()
+
+    def subscribe(self, observer):
+        """Starts sending events to the observer."""
+        self.observers = self.observers + (observer,)
+
+    def unsubscribe(self, observer):
+        """Stops sending events to the observer."""
+        self.observers = tuple(o for o in self.observers if o is not observer)
+
+    def _notify(self, event, *args):
+        for observer in self.observers:
+            handler = getattr(observer, 'on_' + event, None)
+            if handler is not None:
+                handler(self, *args)
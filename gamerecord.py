@@ -0,0 +1,263 @@
+"""Game records: a PGN-like text format for chess and checkers games, a streaming reader and headless replay.
+
+A record is a block of tag lines followed by the moves, and records are separated by blank lines::
+
+    [Game "chess"]
+    [Result "*"]
+    [FEN "rniqkbnr/m1pppppa/1p6/8/8/1P6/M1PPPPPA/RNIQKBNR w 2 -"]
+
+    1. g2g3 g7g6 2. f1g2 f8g7 *
+
+Moves are written as the squares they pass through: 'b2b3' for chess and for a simple checkers move,
+'c3e5g7' for a checkers multi-jump. The FEN tag (notation.py) is present only when the game did not
+start from the usual position. Move numbers are optional when reading.
+
+read_games yields one record at a time, so archives of any size are processed in constant memory.
+Example: ``python gamerecord.py games.pgn`` replays every game in the file and prints a summary.
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from chessboard import Board
+from checker import Board1
+from notation import to_fen, from_fen, checkers_to_fen, checkers_from_fen
+
+GAMES = {
+    'chess': Board,
+    'checkers': Board1,
+}
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+OUTCOMES = {'white': '1-0', 'black': '0-1', 'draw': '1/2-1/2'}
+
+_TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+_SQUARE = re.compile(r'([a-h][1-8])')
+
+
+class GameRecord:
+    """A recorded game.
+
+    Attributes:
+        tags (dict): Tag names to values; 'Game' and 'Result' are always present.
+        moves (list): The moves, each a tuple of (str, int) positions as accepted by make_move.
+    """
+
+    def __init__(self, game='chess', moves=None, result='*', tags=None):
+        self.tags = {'Game': game, 'Result': result}
+        if tags:
+            self.tags.update(tags)
+        self.moves = moves if moves is not None else []
+
+    @property
+    def game(self):
+        return self.tags['Game']
+
+    @property
+    def result(self):
+        return self.tags['Result']
+
+    @classmethod
+    def from_board(cls, board, result='*', tags=None):
+        """Records the moves in board.history, taking them back to find the starting position.
+
+        The board is returned to its current position. A chessboard is not touched at all: its moves are
+        taken back on a copy, since making them again would create new Move objects and drop the board's
+        redo line and checkpoints.
+        """
+        game = 'checkers' if isinstance(board, Board1) else 'chess'
+        position = board.copy() if game == 'chess' else board
+        made = []
+        while position.history:
+            made.append(position.unmake_move())
+        made.reverse()
+        record = cls(game, [], result, tags)
+        start = to_fen(position) if game == 'chess' else checkers_to_fen(position)
+        if start != _start_fen(game):
+            record.tags['FEN'] = start
+        for move in made:
+            path = move.path if game == 'checkers' else (move.start, move.end)
+            record.moves.append(path)
+            if position is board:
+                board.make_move(*path)
+        return record
+
+    def __repr__(self):
+        return f"GameRecord({self.game!r}, {len(self.moves)} moves, result={self.result!r})"
+
+
+_start_fens = {}
+
+
+def _start_fen(game):
+    if game not in _start_fens:
+        board = GAMES[game]()
+        _start_fens[game] = to_fen(board) if game == 'chess' else checkers_to_fen(board)
+    return _start_fens[game]
+
+
+def format_move(move):
+    """Returns the text of a move: its squares written one after another, e.g. 'e2e4' or 'c3e5g7'."""
+    return ''.join(f"{col}{row}" for col, row in move)
+
+
+def parse_move(text):
+    """Parses the text of a move into a tuple of (str, int) positions.
+
+    Raises:
+        ValueError: If the text is not a sequence of at least two squares.
+    """
+    squares = _SQUARE.findall(text)
+    if len(squares) < 2 or ''.join(squares) != text:
+        raise ValueError(f"not a move: {text!r}")
+    return tuple((square[0], int(square[1])) for square in squares)
+
+
+def write_game(file, record):
+    """Writes one record to a text file, followed by a blank line."""
+    for name, value in record.tags.items():
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        file.write(f'[{name} "{escaped}"]\n')
+    file.write('\n')
+    words = []
+    for ply, move in enumerate(record.moves):
+        if ply % 2 == 0:
+            words.append(f"{ply // 2 + 1}.")
+        words.append(format_move(move))
+    words.append(record.result)
+    line = ''
+    for word in words:
+        if line and len(line) + len(word) >= 80:
+            file.write(line + '\n')
+            line = ''
+        line = f"{line} {word}" if line else word
+    file.write(line + '\n\n')
+
+
+def write_games(file, records):
+    """Writes every record of an iterable; returns how many were written."""
+    count = 0
+    for record in records:
+        write_game(file, record)
+        count += 1
+    return count
+
+
+def read_games(file):
+    """Yields the records of a text file one at a time.
+
+    Only the game being read is kept in memory, so the file may be of any size.
+
+    Raises:
+        ValueError: If a line cannot be parsed; the message gives the line number.
+    """
+    tags = {}
+    moves = []
+    in_moves = False
+    number = 0
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('['):
+            if in_moves:
+                yield _record(tags, moves, number)
+                tags, moves, in_moves = {}, [], False
+            match = _TAG.fullmatch(line)
+            if match is None:
+                raise ValueError(f"line {number}: bad tag {line!r}")
+            tags[match.group(1)] = re.sub(r'\\(.)', r'\1', match.group(2))
+            continue
+        in_moves = True
+        for word in line.split():
+            if word in RESULTS:
+                tags.setdefault('Result', word)
+                continue
+            if word.endswith('.') and word[:-1].isdigit():
+                continue
+            try:
+                moves.append(parse_move(word))
+            except ValueError as error:
+                raise ValueError(f"line {number}: {error}") from None
+    if tags or moves:
+        yield _record(tags, moves, number)
+
+
+def _record(tags, moves, number):
+    game = tags.pop('Game', 'chess')
+    if game not in GAMES:
+        raise ValueError(f"line {number}: unknown game {game!r}")
+    return GameRecord(game, moves, tags.pop('Result', '*'), tags)
+
+
+def replay(record, board=None):
+    """Plays the moves of a record on a board without any output.
+
+    Args:
+        record (GameRecord): The game to replay.
+        board (optional): Board to play on; set up from the FEN tag or the usual start by default.
+
+    Returns:
+        tuple: (board, error) where error is None, or the (ply, move) of the first illegal move; the
+        board is left in the position before that move.
+    """
+    if board is None:
+        fen = record.tags.get('FEN')
+        if record.game == 'chess':
+            board = from_fen(fen) if fen else Board()
+        else:
+            board = checkers_from_fen(fen) if fen else Board1()
+    chess = record.game == 'chess'
+    for ply, move in enumerate(record.moves):
+        mover = board.turn
+        made = board.make_move(*move)
+        if made is None:
+            return board, (ply, move)
+        if chess and made.point.color != mover:
+            board.unmake_move()
+            return board, (ply, move)
+    return board, None
+
+
+def replay_all(records):
+    """Replays every record of an iterable and summarises them.
+
+    Returns:
+        dict: games, plies, invalid (the number of games with an illegal move), results (counts per
+        result tag), seconds and games_per_second.
+    """
+    started = time.perf_counter()
+    summary = {'games': 0, 'plies': 0, 'invalid': 0, 'results': {}}
+    for record in records:
+        board, error = replay(record)
+        summary['games'] += 1
+        summary['plies'] += len(board.history)
+        if error is not None:
+            summary['invalid'] += 1
+        summary['results'][record.result] = summary['results'].get(record.result, 0) + 1
+    seconds = time.perf_counter() - started
+    summary['seconds'] = round(seconds, 6)
+    summary['games_per_second'] = round(summary['games'] / seconds, 3) if seconds > 0 else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay and check recorded games.")
+    parser.add_argument('file', help="game record file ('-' for standard input)")
+    args = parser.parse_args(argv)
+
+    if args.file == '-':
+        summary = replay_all(read_games(sys.stdin))
+    else:
+        with open(args.file, encoding='utf-8') as file:
+            summary = replay_all(read_games(file))
+    print(f"{summary['games']} games, {summary['plies']} plies replayed in {summary['seconds']:.2f} s "
+          f"({summary['games_per_second']} games/s), {summary['invalid']} with an illegal move")
+    for result, count in sorted(summary['results'].items()):
+        print(f"{result}: {count}")
+    return 1 if summary['invalid'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Opt-in instrumentation of the chess hot paths: call counters and timing histograms.
+
+While enabled, these calls are counted and timed:
+
+* ``can_move`` of every Figure subclass, one series per piece type;
+* ``Board.move_figure``, split by branch: ``normal``, ``magnet_pull``, ``princess_capture`` and ``refused``;
+* ``Board.undo_move`` and ``Board.draw_board``.
+
+enable() replaces those methods on their classes with timing wrappers and disable() puts the original
+functions back, so while instrumentation is off the classes are exactly as defined in chessboard.py and it
+costs nothing. Times are measured with time.perf_counter_ns and kept in histograms with power-of-two
+buckets, so recording a call is a bit_length and a list increment. Reports are available as a dict, JSON or
+Prometheus text exposition format.
+
+    with Instrumentation() as stats:
+        board.move_figure(('b', 2), ('b', 3))
+    print(stats.to_prometheus())
+
+Or from the command line, on random games: ``python instrumentation.py --games 20 --format prometheus``.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+
+from chessboard import Board, Figure, Princess
+
+# Bucket i holds calls that took less than 2 ** (FIRST_BUCKET_BITS + i) nanoseconds; the last one is +Inf.
+FIRST_BUCKET_BITS = 7
+BUCKETS = 20
+BUCKET_BOUNDS = tuple(2 ** (FIRST_BUCKET_BITS + index) for index in range(BUCKETS - 1))
+
+_active = None
+
+
+class Histogram:
+    """Call count, total time and power-of-two histogram of the durations of one instrumented call.
+
+    Attributes:
+        count (int): Number of calls recorded.
+        total_ns (int): Sum of their durations in nanoseconds.
+        buckets (list): BUCKETS counters; bucket i counts durations below BUCKET_BOUNDS[i], the last one the rest.
+    """
+
+    __slots__ = ('count', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def record(self, nanoseconds):
+        """Adds one call that took the given number of nanoseconds."""
+        self.count += 1
+        self.total_ns += nanoseconds
+        index = nanoseconds.bit_length() - FIRST_BUCKET_BITS
+        self.buckets[min(max(index, 0), BUCKETS - 1)] += 1
+
+    def quantile(self, fraction):
+        """Returns the upper bound in nanoseconds of the bucket holding the given quantile.
+
+        None is returned if nothing was recorded or the quantile falls in the last, unbounded bucket.
+
+        Args:
+            fraction (float): 0.5 for the median, 0.99 for the 99th percentile and so on.
+        """
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for index, calls in enumerate(self.buckets[:-1]):
+            seen += calls
+            if seen >= wanted:
+                return BUCKET_BOUNDS[index]
+        return None
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns // self.count if self.count else 0,
+            'p50_ns': self.quantile(0.5),
+            'p99_ns': self.quantile(0.99),
+            'buckets': {str(bound): calls for bound, calls in zip(BUCKET_BOUNDS + ('+Inf',), self.buckets)},
+        }
+
+
+def _move_branch(result):
+    if not result:
+        return 'refused'
+    if result.pulled is not None:
+        return 'magnet_pull'
+    if result.captured is not None and isinstance(result.piece, Princess):
+        return 'princess_capture'
+    return 'normal'
+
+
+class Instrumentation:
+    """Counts and times the chess hot paths while enabled; see the module docstring.
+
+    Only one instance can be enabled at a time, since the wrappers are installed on the classes themselves.
+    Recording is not locked: it is meant for the single-threaded game loop, benchmarks and self-play.
+
+    Attributes:
+        histograms (dict): Maps (call, kind) pairs, e.g. ('can_move', 'Pawn') or ('move_figure', 'magnet_pull'),
+            to Histograms. kind is '' for undo_move and draw_board.
+        enabled (bool): Whether the wrappers are installed.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.enabled = False
+        self._originals = []
+
+    def _histogram(self, call, kind=''):
+        histogram = self.histograms.get((call, kind))
+        if histogram is None:
+            histogram = self.histograms[(call, kind)] = Histogram()
+        return histogram
+
+    def _install(self, cls, name, wrapper):
+        self._originals.append((cls, name, cls.__dict__[name]))
+        setattr(cls, name, wrapper)
+
+    def _timed(self, original, histogram):
+        clock = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            started = clock()
+            result = original(*args, **kwargs)
+            histogram.record(clock() - started)
+            return result
+
+        wrapper.__wrapped__ = original
+        return wrapper
+
+    def _timed_move_figure(self, original):
+        clock = time.perf_counter_ns
+        histograms = {kind: self._histogram('move_figure', kind)
+                      for kind in ('normal', 'magnet_pull', 'princess_capture', 'refused')}
+
+        def move_figure(board, start, end):
+            started = clock()
+            result = original(board, start, end)
+            histograms[_move_branch(result)].record(clock() - started)
+            return result
+
+        move_figure.__wrapped__ = original
+        return move_figure
+
+    def enable(self):
+        """Installs the timing wrappers.
+
+        Raises:
+            RuntimeError: If another Instrumentation is enabled.
+        """
+        global _active
+        if self.enabled:
+            return
+        if _active is not None:
+            raise RuntimeError("another Instrumentation is already enabled")
+        pieces = [Figure]
+        while pieces:
+            cls = pieces.pop()
+            pieces.extend(cls.__subclasses__())
+            if 'can_move' in cls.__dict__:
+                histogram = self._histogram('can_move', cls.__name__)
+                self._install(cls, 'can_move', self._timed(cls.__dict__['can_move'], histogram))
+        self._install(Board, 'move_figure', self._timed_move_figure(Board.__dict__['move_figure']))
+        for name in ('undo_move', 'draw_board'):
+            self._install(Board, name, self._timed(Board.__dict__[name], self._histogram(name)))
+        self.enabled = True
+        _active = self
+
+    def disable(self):
+        """Puts the original methods back; the histograms are kept."""
+        global _active
+        if not self.enabled:
+            return
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+        self.enabled = False
+        _active = None
+
+    def reset(self):
+        """Clears all histograms."""
+        for histogram in self.histograms.values():
+            histogram.__init__()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+        return False
+
+    def report(self):
+        """Returns the histograms as a dict: call -> kind -> Histogram.as_dict(); calls never made are left out."""
+        report = {}
+        for (call, kind), histogram in sorted(self.histograms.items()):
+            if histogram.count:
+                report.setdefault(call, {})[kind or 'all'] = histogram.as_dict()
+        return report
+
+    def to_json(self, indent=2):
+        """Returns report() as JSON text."""
+        return json.dumps(self.report(), indent=indent)
+
+    def to_prometheus(self, prefix='fa_chess'):
+        """Returns the histograms in the Prometheus text exposition format, as one histogram family in seconds.
+
+        Args:
+            prefix (str): Metric name prefix.
+        """
+        name = f"{prefix}_call_duration_seconds"
+        lines = [f"# HELP {name} Duration of instrumented chess calls.", f"# TYPE {name} histogram"]
+        for (call, kind), histogram in sorted(self.histograms.items()):
+            if not histogram.count:
+                continue
+            labels = f'call="{call}"' + (f',kind="{kind}"' if kind else '')
+            cumulative = 0
+            for bound, calls in zip(BUCKET_BOUNDS, histogram.buckets):
+                cumulative += calls
+                lines.append(f'{name}_bucket{{{labels},le="{bound / 1e9:.9g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total_ns / 1e9:.9g}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def play_random(games, max_plies=100, seed=0):
+    """Plays random games through move_figure, with a refused move before every move and a few undos.
+
+    draw_board is called after every move with its output thrown away.
+    """
+    rng = random.Random(seed)
+    for _ in range(games):
+        board = Board()
+        for _ in range(max_plies):
+            moves = board.generate_moves(board.turn)
+            if not moves or board.find_king('white') is None or board.find_king('black') is None:
+                break
+            start = rng.choice(moves)[0]
+            end = (rng.choice('abcdefgh'), rng.randint(1, 8))
+            if (start, end) not in moves:
+                board.move_figure(start, end)
+            board.move_figure(*rng.choice(moves))
+            with contextlib.redirect_stdout(io.StringIO()):
+                board.draw_board()
+            if rng.random() < 0.1:
+                board.undo_move(board.turn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the chess hot paths on random games.")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--plies', type=int, default=100, help="moves per game at most")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=('json', 'prometheus'), default='json')
+    args = parser.parse_args(argv)
+
+    with Instrumentation() as stats:
+        play_random(args.games, args.plies, args.seed)
+    if args.format == 'json':
+        print(stats.to_json())
+    else:
+        print(stats.to_prometheus(), end='')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
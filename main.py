@@ -1,19 +1,50 @@
-from chessboard import Board as ChessBoard
-from checker import Board1 as CheckersBoard
+import os
+
+
+# Игровые модули загружаются только после выбора игры: шашкам не нужны шахматы, движок и дебютная книга
+def play_chess():
+    from chessboard import Board as ChessBoard
+    board = ChessBoard()
+    board.Whose_move()
+
+
+def play_checkers():
+    from checker import Board1 as CheckersBoard
+    board = CheckersBoard()
+    board.play()
+
+
+def play_chess_ai():
+    from chessboard import Board as ChessBoard
+    from engine import Engine
+    from opening_book import OpeningBook, DEFAULT_PATH as BOOK_PATH
+    board = ChessBoard()
+    book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+    try:
+        board.Whose_move(ai=Engine(time_limit=2.0, book=book), ai_color='black')
+    finally:
+        if book is not None:
+            book.close()
+
+
+GAMES = {
+    "1": play_chess,
+    "2": play_checkers,
+    "3": play_chess_ai,
+}
+
 
 def main():
     print("Выберите игру:")
     print("1 - Шахматы")
     print("2 - Шашки")
+    print("3 - Шахматы против компьютера")
 
     choice = input("Введите номер игры: ")
 
-    if choice == "1":
-        board = ChessBoard()
-        board.Whose_move()
-    elif choice == "2":
-        board = CheckersBoard()
-        board.play()
+    game = GAMES.get(choice)
+    if game is not None:
+        game()
     else:
         print("Некорректный выбор.")
 
@@ -0,0 +1,263 @@
+"""Text and binary notation for chess (chessboard.Board) and checkers (checker.Board1) positions.
+
+Text notation is FEN-like: the rows from 8 down to 1 separated by '/', every piece as a letter
+(upper case for white) and runs of empty squares as digits, then the side to move ('w' or 'b') and
+the number of moves made. Chess adds a fourth field with the squares of the princesses that have
+already eaten ('-' if none)::
+
+    rniqkbnr/mppppppa/8/8/8/8/MPPPPPPA/RNIQKBNR w 0 -
+
+Chess letters are P, R, N, B, Q, K, M (magnet), A (kangaroo) and I (princess). Checkers uses the
+letters of the board display: W and B for men, w and b for kings.
+
+Binary notation has a fixed width, so positions can be stored, compared and sent between processes as
+plain bytes. A chess position takes 32 bytes: the occupancy bitboard (8 bytes), a 5-bit code for every
+occupied square in square order (20 bytes), a flags byte (black to move, odd move count) and padding.
+A checkers position takes 16 bytes: the white, black and king masks of checker.Board1 and a flags
+byte. Only the parity of the move count is kept, since that is all the rules depend on.
+"""
+
+import struct
+
+from chessboard import (Board, SQUARES, FIGURE_NAMES, square_index,
+                        Pawn, Rook, Knight, Bishop, Queen, King, Princess, Magnet, Kangaroo)
+from checker import Board1, Checker, SQUARE_POSITIONS
+
+PIECE_LETTERS = {
+    'Pawn': 'P',
+    'Rook': 'R',
+    'Knight': 'N',
+    'Bishop': 'B',
+    'Queen': 'Q',
+    'King': 'K',
+    'Magnet': 'M',
+    'Kangaroo': 'A',
+    'Princess': 'I',
+}
+LETTER_PIECES = {letter: name for name, letter in PIECE_LETTERS.items()}
+PIECE_CLASSES = {cls.__name__: cls for cls in (Pawn, Rook, Knight, Bishop, Queen, King, Princess, Magnet, Kangaroo)}
+CHECKER_LETTERS = {('white', False): 'W', ('black', False): 'B', ('white', True): 'w', ('black', True): 'b'}
+LETTER_CHECKERS = {letter: key for key, letter in CHECKER_LETTERS.items()}
+
+CHESS_SIZE = 32
+CHECKERS_SIZE = 16
+_CHECKERS_RECORD = struct.Struct('<IIIB3x')
+_BLACK_TO_MOVE = 1
+_ODD_MOVE = 2
+# Код фигуры: номер типа в FIGURE_NAMES (съевшая принцесса - отдельный тип) * 2 + цвет
+_EATEN_PRINCESS = len(FIGURE_NAMES)
+
+
+def _rows_to_text(cell):
+    # cell(col, row) -> буква или None; ряды сверху вниз, пустые клетки подряд - цифрой
+    rows = []
+    for row in range(8, 0, -1):
+        text = ''
+        empty = 0
+        for col in 'abcdefgh':
+            letter = cell(col, row)
+            if letter is None:
+                empty += 1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            text += letter
+        rows.append(text + (str(empty) if empty else ''))
+    return '/'.join(rows)
+
+
+def _text_to_rows(text):
+    # Обратное к _rows_to_text: {(col, row): буква}
+    rows = text.split('/')
+    if len(rows) != 8:
+        raise ValueError(f"expected 8 rows, got {len(rows)}: {text!r}")
+    letters = {}
+    for row, row_text in zip(range(8, 0, -1), rows):
+        col_num = 0
+        for char in row_text:
+            if char.isdigit():
+                col_num += int(char)
+            else:
+                if col_num < 8:
+                    letters['abcdefgh'[col_num], row] = char
+                col_num += 1
+        if col_num != 8:
+            raise ValueError(f"row {row} does not have 8 squares: {row_text!r}")
+    return letters
+
+
+def _split(text, fields):
+    parts = text.split()
+    if len(parts) != fields:
+        raise ValueError(f"expected {fields} fields, got {len(parts)}: {text!r}")
+    if parts[1] not in ('w', 'b'):
+        raise ValueError(f"side to move must be 'w' or 'b': {parts[1]!r}")
+    if not parts[2].isdigit():
+        raise ValueError(f"move count must be a number: {parts[2]!r}")
+    return parts
+
+
+def to_fen(board):
+    """Returns the text notation of a chess position."""
+    markup = board.markup
+    eaten = []
+
+    def cell(col, row):
+        piece = markup[col][row - 1]
+        if piece is None:
+            return None
+        if board.has_eaten(square_index(col, row)):
+            eaten.append(f"{col}{row}")
+        letter = PIECE_LETTERS[piece.name]
+        return letter if piece.color == 'white' else letter.lower()
+
+    rows = _rows_to_text(cell)
+    turn = 'w' if board.turn == 'white' else 'b'
+    return f"{rows} {turn} {board.move_count} {','.join(sorted(eaten)) or '-'}"
+
+
+def from_fen(text, board=None):
+    """Sets up a chess position from its text notation.
+
+    Args:
+        text (str): Notation as returned by to_fen.
+        board (Board, optional): Board to set up; a new one by default.
+
+    Returns:
+        Board: The board, with an empty history.
+
+    Raises:
+        ValueError: If the text is not valid notation.
+    """
+    rows, turn, move_count, eaten = _split(text, 4)
+    eaten = set() if eaten == '-' else {(square[0], int(square[1:])) for square in eaten.split(',')}
+    pieces = {}
+    for position, letter in _text_to_rows(rows).items():
+        name = LETTER_PIECES.get(letter.upper())
+        if name is None:
+            raise ValueError(f"unknown piece letter {letter!r}")
+        pieces[position] = PIECE_CLASSES[name]('white' if letter.isupper() else 'black')
+    board = board or Board()
+    board.setup(pieces, 'white' if turn == 'w' else 'black', int(move_count), eaten)
+    return board
+
+
+def checkers_to_fen(board):
+    """Returns the text notation of a checkers position."""
+    markup = board.markup
+
+    def cell(col, row):
+        checker = markup[col][row - 1]
+        return None if checker is None else CHECKER_LETTERS[checker.color, checker.king]
+
+    turn = 'w' if board.turn == 'white' else 'b'
+    return f"{_rows_to_text(cell)} {turn} {board.move_count}"
+
+
+def checkers_from_fen(text, board=None):
+    """Sets up a checkers position from its text notation (see from_fen)."""
+    rows, turn, move_count = _split(text, 3)
+    pieces = {}
+    for position, letter in _text_to_rows(rows).items():
+        if letter not in LETTER_CHECKERS:
+            raise ValueError(f"unknown checker letter {letter!r}")
+        pieces[position] = Checker(*LETTER_CHECKERS[letter])
+    board = board or Board1()
+    board.setup(pieces, 'white' if turn == 'w' else 'black', int(move_count))
+    return board
+
+
+def pack(board):
+    """Returns the 32-byte binary notation of a chess position.
+
+    Raises:
+        ValueError: If more than 32 pieces are on the board.
+    """
+    markup = board.markup
+    occupancy = 0
+    codes = 0
+    count = 0
+    for square, (col, row) in enumerate(SQUARES):
+        piece = markup[col][row - 1]
+        if piece is None:
+            continue
+        if count == 32:
+            raise ValueError("more than 32 pieces do not fit into the packed notation")
+        if board.eaten >> square & 1:
+            kind = _EATEN_PRINCESS
+        else:
+            kind = FIGURE_NAMES.index(piece.name)
+        occupancy |= 1 << square
+        codes |= (kind * 2 + (piece.color == 'black')) << (5 * count)
+        count += 1
+    flags = (board.turn == 'black') * _BLACK_TO_MOVE | (board.move_count % 2) * _ODD_MOVE
+    return occupancy.to_bytes(8, 'little') + codes.to_bytes(20, 'little') + bytes((flags, 0, 0, 0))
+
+
+def unpack(data, board=None):
+    """Sets up a chess position from its 32-byte binary notation; move_count becomes 0 or 1."""
+    if len(data) != CHESS_SIZE:
+        raise ValueError(f"packed chess position must be {CHESS_SIZE} bytes, got {len(data)}")
+    occupancy = int.from_bytes(data[:8], 'little')
+    codes = int.from_bytes(data[8:28], 'little')
+    flags = data[28]
+    pieces = {}
+    eaten = []
+    while occupancy:
+        low = occupancy & -occupancy
+        occupancy ^= low
+        kind, color = divmod(codes & 31, 2)
+        codes >>= 5
+        if kind > _EATEN_PRINCESS:
+            raise ValueError(f"invalid piece code {kind * 2 + color}")
+        position = SQUARES[low.bit_length() - 1]
+        if kind == _EATEN_PRINCESS:
+            eaten.append(position)
+        pieces[position] = PIECE_CLASSES['Princess' if kind == _EATEN_PRINCESS else FIGURE_NAMES[kind]](
+            'black' if color else 'white')
+    board = board or Board()
+    board.setup(pieces, 'black' if flags & _BLACK_TO_MOVE else 'white', 1 if flags & _ODD_MOVE else 0, eaten)
+    return board
+
+
+def pack_checkers(board):
+    """Returns the 16-byte binary notation of a checkers position."""
+    flags = (board.turn == 'black') * _BLACK_TO_MOVE | (board.move_count % 2) * _ODD_MOVE
+    return _CHECKERS_RECORD.pack(board.white, board.black, board.kings, flags)
+
+
+def unpack_checkers(data, board=None):
+    """Sets up a checkers position from its 16-byte binary notation."""
+    if len(data) != CHECKERS_SIZE:
+        raise ValueError(f"packed checkers position must be {CHECKERS_SIZE} bytes, got {len(data)}")
+    white, black, kings, flags = _CHECKERS_RECORD.unpack(data)
+    if white & black or kings & ~(white | black):
+        raise ValueError("invalid packed checkers position")
+    pieces = {}
+    for i, position in enumerate(SQUARE_POSITIONS):
+        if (white | black) >> i & 1:
+            pieces[position] = Checker('white' if white >> i & 1 else 'black', bool(kings >> i & 1))
+    board = board or Board1()
+    board.setup(pieces, 'black' if flags & _BLACK_TO_MOVE else 'white', 1 if flags & _ODD_MOVE else 0)
+    return board
+
+
+def pack_many(boards):
+    """Packs many positions of one game into a single bytes object (chess or checkers by board type)."""
+    return b''.join(pack_checkers(board) if isinstance(board, Board1) else pack(board) for board in boards)
+
+
+def unpack_many(data, game='chess'):
+    """Yields a new board for every packed position in data.
+
+    Args:
+        data (bytes): Positions as returned by pack_many.
+        game (str): 'chess' or 'checkers'.
+    """
+    size, decode = (CHESS_SIZE, unpack) if game == 'chess' else (CHECKERS_SIZE, unpack_checkers)
+    if len(data) % size:
+        raise ValueError(f"length {len(data)} is not a multiple of {size}")
+    view = memoryview(data)
+    for offset in range(0, len(data), size):
+        yield decode(view[offset:offset + size])
@@ -0,0 +1,216 @@
+"""Opening book for the chess variant, built from self-play games.
+
+Every game starts from the same position, so the first moves are worth computing once. The builder
+plays games with selfplay policies and counts, for every position of the first ``--plies`` moves, how
+well each move scored. The book file holds those statistics as fixed-size records sorted by Zobrist
+key; OpeningBook memory-maps the file and finds a position by binary search.
+
+Example: ``python opening_book.py build --games 2000 --plies 10 --output opening_book.bin``.
+
+File format: a 16-byte header (magic ``FABK``, format version, padding and the number of records),
+followed by 12-byte little-endian records (u64 position key, u16 move, u16 weight). A move is
+``start * 64 + end`` with squares numbered as by chessboard.square_index; the weight is two points
+per game the move won and one per draw.
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from chessboard import Board, SQUARES, square_index
+from selfplay import POLICIES, play_game
+
+MAGIC = b'FABK'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQ')
+RECORD = struct.Struct('<QHH')
+MAX_WEIGHT = 0xFFFF
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+
+def encode_move(move):
+    """Packs a (start, end) move into 16 bits."""
+    start, end = move
+    return square_index(*start) * 64 + square_index(*end)
+
+
+def decode_move(code):
+    """Unpacks a 16-bit move into (start, end) positions."""
+    return SQUARES[code >> 6], SQUARES[code & 63]
+
+
+def _collect(white, black, first, count, plies, max_plies, seed):
+    """Plays games first .. first + count - 1 (seeded as in selfplay) and scores their opening moves.
+
+    Returns:
+        Counter: Maps (position key, move code) to the points scored by the side that played the move.
+    """
+    stats = Counter()
+    for index in range(first, first + count):
+        record = []
+        outcome, _ = play_game('chess', white, black, max_plies, random.Random(seed + index), record)
+        board = Board()
+        for move in record[:plies]:
+            points = 1 if outcome == 'draw' else 2 if outcome == board.turn else 0
+            stats[board.hash, encode_move(move)] += points
+            board.make_move(*move)
+    return stats
+
+
+def build(path, white, black, games=1000, plies=10, max_plies=200, workers=1, seed=0, min_weight=1):
+    """Plays self-play games and writes the opening book.
+
+    Args:
+        path (str): Book file to write.
+        white: Policy for white (see selfplay.POLICIES).
+        black: Policy for black.
+        games (int): Number of games to play.
+        plies (int): How many first moves of every game go into the book.
+        max_plies (int): Length limit of every game; longer games count as draws.
+        workers (int): Number of processes to spread the games over.
+        seed (int): Base random seed.
+        min_weight (int): Moves that scored fewer points are left out.
+
+    Returns:
+        int: The number of records written.
+    """
+    if workers <= 1:
+        parts = [_collect(white, black, 0, games, plies, max_plies, seed)]
+    else:
+        chunk = -(-games // workers)
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_collect, white, black, first, min(chunk, games - first), plies, max_plies, seed)
+                       for first in range(0, games, chunk)]
+            parts = [future.result() for future in futures]
+    stats = Counter()
+    for part in parts:
+        stats.update(part)
+
+    records = sorted((key, move, min(weight, MAX_WEIGHT))
+                     for (key, move), weight in stats.items() if weight >= min_weight)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            file.write(RECORD.pack(*record))
+    return len(records)
+
+
+class OpeningBook:
+    """Read access to an opening book file.
+
+    Attributes:
+        path (str): The book file.
+        size (int): Number of records.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """Opens and memory-maps the book.
+
+        Raises:
+            ValueError: If the file is not an opening book of this version.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION or len(self._data) != HEADER.size + self.size * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def _key(self, index):
+        return RECORD.unpack_from(self._data, HEADER.size + index * RECORD.size)[0]
+
+    def moves(self, board):
+        """Returns the book moves of the position as [(move, weight), ...], heaviest first.
+
+        Moves that are not legal in the position (possible only on a hash collision) are left out.
+        """
+        key = board.hash
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        legal = None
+        for index in range(low, self.size):
+            record_key, code, weight = RECORD.unpack_from(self._data, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            if legal is None:
+                legal = board.generate_moves(board.turn)
+            move = decode_move(code)
+            if move in legal:
+                found.append((move, weight))
+        found.sort(key=lambda item: -item[1])
+        return found
+
+    def choose(self, board, rng=None):
+        """Returns a book move picked at random in proportion to its weight, or None if the position is unknown."""
+        moves = self.moves(board)
+        if not moves:
+            return None
+        rng = rng or random
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Opening book of the chess variant.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="build the book from self-play games")
+    build_parser.add_argument('--output', default=DEFAULT_PATH)
+    build_parser.add_argument('--games', type=int, default=1000)
+    build_parser.add_argument('--plies', type=int, default=10, help="first moves of every game to record")
+    build_parser.add_argument('--white', choices=tuple(POLICIES), default='random')
+    build_parser.add_argument('--black', choices=tuple(POLICIES), default='random')
+    build_parser.add_argument('--depth', type=int, default=2, help="search depth of the engine policy")
+    build_parser.add_argument('--max-plies', type=int, default=200)
+    build_parser.add_argument('--min-weight', type=int, default=1)
+    build_parser.add_argument('--workers', type=int, default=1)
+    build_parser.add_argument('--seed', type=int, default=0)
+    show_parser = commands.add_parser('show', help="print the book moves of the starting position")
+    show_parser.add_argument('--book', default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        with OpeningBook(args.book) as book:
+            for (start, end), weight in book.moves(Board()):
+                print(f"{start[0]}{start[1]}{end[0]}{end[1]} {weight}")
+        return 0
+
+    def policy(name):
+        return POLICIES[name](args.depth) if name == 'engine' else POLICIES[name]()
+
+    started = time.perf_counter()
+    records = build(args.output, policy(args.white), policy(args.black), args.games, args.plies,
+                    args.max_plies, args.workers, args.seed, args.min_weight)
+    print(f"{records} records from {args.games} games written to {args.output} "
+          f"in {time.perf_counter() - started:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
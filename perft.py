@@ -0,0 +1,194 @@
+"""Perft benchmark: counts the leaf nodes of the move tree and measures how fast moves are generated and made.
+
+Run ``python perft.py`` for a table or ``python perft.py --json`` for machine-readable output.
+With ``--baseline previous.json`` the run fails when nodes per second drop by more than
+``--tolerance`` compared with an earlier JSON report. A wrong node count always fails the run.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from chessboard import Board, Pawn, Rook, Knight, Bishop, Queen, King, Princess, Magnet, Kangaroo
+from checker import Board1, Checker
+
+
+def perft(board, depth):
+    """Counts the positions reachable in exactly depth moves, starting with board.turn to move.
+
+    Works with chessboard.Board (and its BitBoard backend) as well as checker.Board1.
+
+    Args:
+        board: The board to walk; it is returned to its original state.
+        depth (int): Number of moves to look ahead.
+
+    Returns:
+        int: The number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+    moves = board.generate_moves(board.turn)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(*move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def perft_divide(board, depth):
+    """Splits the perft count of a position by its first move, which helps to find where two versions disagree.
+
+    Returns:
+        dict: Maps 'a2a3'-style move strings (every square of a checkers jump chain) to their leaf counts.
+    """
+    counts = {}
+    for move in board.generate_moves(board.turn):
+        board.make_move(*move)
+        counts[''.join(f"{col}{row}" for col, row in move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def _square(name):
+    return name[0], int(name[1])
+
+
+def _chess(pieces, turn='white', move_count=0, eaten=()):
+    def build():
+        board = Board()
+        board.setup({_square(name): piece for name, piece in pieces.items()}, turn, move_count,
+                    [_square(name) for name in eaten])
+        return board
+    return build
+
+
+def _checkers(pieces, turn='white'):
+    def build():
+        board = Board1()
+        board.setup({_square(name): Checker(color) for name, color in pieces.items()}, turn)
+        return board
+    return build
+
+
+# (game, position name, board factory, {depth: expected leaf count})
+POSITIONS = [
+    ('chess', 'start', Board, {1: 31, 2: 502, 3: 14217, 4: 285559}),
+    ('chess', 'magnets', _chess({
+        'e1': King('white'), 'd4': Magnet('white'), 'a1': Rook('white'), 'c3': Pawn('white'),
+        'e8': King('black'), 'd7': Queen('black'), 'g7': Knight('black'), 'b6': Pawn('black'),
+        'h4': Magnet('black'), 'f2': Bishop('black'),
+    }), {1: 28, 2: 1061, 3: 27784, 4: 1079815}),
+    ('chess', 'princess', _chess({
+        'e1': King('white'), 'c1': Princess('white'), 'd1': Queen('white'), 'b2': Pawn('white'),
+        'e8': King('black'), 'c8': Princess('black'), 'd8': Queen('black'), 'f6': Knight('black'),
+        'a7': Pawn('black'),
+    }, eaten=('c8',)), {1: 23, 2: 489, 3: 13541, 4: 357108}),
+    ('chess', 'princess-odd', _chess({
+        'e1': King('white'), 'c4': Princess('white'), 'd5': Pawn('black'),
+        'e8': King('black'), 'c7': Princess('black'), 'h1': Rook('white'),
+    }, turn='black', move_count=1, eaten=('c4',)), {1: 6, 2: 132, 3: 940, 4: 22656}),
+    ('chess', 'kangaroo', _chess({
+        'e1': King('white'), 'd4': Kangaroo('white'), 'h1': Kangaroo('white'), 'g4': Rook('black'),
+        'e8': King('black'), 'a7': Kangaroo('black'), 'd7': Kangaroo('black'), 'a4': Pawn('white'),
+    }), {1: 15, 2: 304, 3: 4188, 4: 88491}),
+    ('checkers', 'start', Board1, {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7361, 6: 36768}),
+    ('checkers', 'jumps', _checkers({
+        'c3': 'white', 'e3': 'white', 'd2': 'white', 'g3': 'white',
+        'd4': 'black', 'f4': 'black', 'b4': 'black', 'e5': 'black', 'h6': 'black',
+    }), {1: 3, 2: 5, 3: 12, 4: 35, 5: 125, 6: 493}),
+]
+
+
+def run(games=('chess', 'checkers'), max_depth=None):
+    """Runs perft on every reference position of the selected games.
+
+    Args:
+        games (tuple): Game names to include ('chess', 'checkers').
+        max_depth (int): Deepest depth to run; by default every depth with a known count.
+
+    Returns:
+        list: One dict per position and depth with nodes, expected count, seconds and nodes per second.
+    """
+    results = []
+    for game, name, factory, expected in POSITIONS:
+        if game not in games:
+            continue
+        depths = max(expected) if max_depth is None else max_depth
+        for depth in range(1, depths + 1):
+            board = factory()
+            started = time.perf_counter()
+            nodes = perft(board, depth)
+            seconds = time.perf_counter() - started
+            results.append({
+                'game': game,
+                'position': name,
+                'depth': depth,
+                'nodes': nodes,
+                'expected': expected.get(depth),
+                'ok': expected.get(depth) in (None, nodes),
+                'seconds': round(seconds, 6),
+                'nps': round(nodes / seconds) if seconds > 0 else None,
+            })
+    return results
+
+
+def find_regressions(results, baseline, tolerance, min_seconds=0.05):
+    """Compares nodes per second with an earlier report.
+
+    Args:
+        results (list): Records returned by run.
+        baseline (list): Records of an earlier run.
+        tolerance (float): Allowed relative slowdown, e.g. 0.25 for 25%.
+        min_seconds (float): Baseline timings shorter than this are too noisy and are skipped.
+
+    Returns:
+        list: The records that became slower than allowed, with a 'baseline_nps' field added.
+    """
+    previous = {(r['game'], r['position'], r['depth']): r for r in baseline}
+    slower = []
+    for record in results:
+        old = previous.get((record['game'], record['position'], record['depth']))
+        if old is None or not old.get('nps') or old['seconds'] < min_seconds:
+            continue
+        if record['nps'] < old['nps'] * (1 - tolerance):
+            slower.append(dict(record, baseline_nps=old['nps']))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft node counts and move generation speed.")
+    parser.add_argument('--game', choices=('chess', 'checkers', 'all'), default='all')
+    parser.add_argument('--depth', type=int, help="deepest depth to run (default: all reference depths)")
+    parser.add_argument('--json', action='store_true', help="print a JSON report instead of a table")
+    parser.add_argument('--baseline', help="JSON report of an earlier run to compare speed with")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    games = ('chess', 'checkers') if args.game == 'all' else (args.game,)
+    results = run(games, args.depth)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = find_regressions(results, json.load(file)['results'], args.tolerance)
+    ok = all(record['ok'] for record in results) and not regressions
+
+    if args.json:
+        print(json.dumps({'ok': ok, 'results': results, 'regressions': regressions}, indent=2))
+    else:
+        print(f"{'game':<10}{'position':<14}{'depth':>5}{'nodes':>12}{'expected':>12}{'seconds':>10}{'nodes/s':>12}")
+        for r in results:
+            expected = '' if r['expected'] is None else r['expected']
+            mark = '' if r['ok'] else '  WRONG'
+            print(f"{r['game']:<10}{r['position']:<14}{r['depth']:>5}{r['nodes']:>12}{expected:>12}"
+                  f"{r['seconds']:>10.3f}{r['nps'] or 0:>12}{mark}")
+        for r in regressions:
+            print(f"slower: {r['game']} {r['position']} depth {r['depth']}: {r['nps']} nodes/s, was {r['baseline_nps']}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Headless self-play: plays many games between move-choosing policies without any console output.
+
+Example: ``python selfplay.py --game chess --games 1000 --white random --black greedy --workers 4``.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chessboard import Board, PIECE_VALUES
+from checker import Board1
+
+GAMES = {
+    'chess': Board,
+    'checkers': Board1,
+}
+
+
+def captured_value(game, made):
+    """Returns the material won by a move that has just been made (0 for quiet moves and magnet pulls)."""
+    if game == 'chess':
+        if made.target is not None and made.pulled_to is None:
+            return PIECE_VALUES[made.target.name]
+        return 0
+    return 100 * len(made.captured_checkers)
+
+
+class RandomPolicy:
+    """Plays a uniformly random legal move."""
+
+    name = 'random'
+
+    def choose(self, game, board, moves, rng):
+        return rng.choice(moves)
+
+
+class GreedyPolicy:
+    """Plays the move that wins the most material right away; ties are broken at random."""
+
+    name = 'greedy'
+
+    def choose(self, game, board, moves, rng):
+        best_value = -1
+        best_moves = []
+        for move in moves:
+            value = captured_value(game, board.make_move(*move))
+            board.unmake_move()
+            if value > best_value:
+                best_value = value
+                best_moves = [move]
+            elif value == best_value:
+                best_moves.append(move)
+        return rng.choice(best_moves)
+
+
+class EnginePolicy:
+    """Plays the move chosen by engine.Engine at a fixed depth (chess only)."""
+
+    name = 'engine'
+
+    def __init__(self, depth=2):
+        self.depth = depth
+        self._engine = None
+
+    def choose(self, game, board, moves, rng):
+        if game != 'chess':
+            raise ValueError("the engine policy only plays chess")
+        if self._engine is None:
+            from engine import Engine
+            self._engine = Engine(depth=self.depth, tt_size=1 << 14)
+        return self._engine.search(board).move
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'greedy': GreedyPolicy,
+    'engine': EnginePolicy,
+}
+
+
+def play_game(game, white, black, max_plies=200, rng=None, record=None):
+    """Plays one game silently.
+
+    A chess game is won by capturing the king and drawn when the side to move has no move; a checkers game
+    is lost by the side that cannot move. Games longer than max_plies are drawn.
+
+    Args:
+        game (str): 'chess' or 'checkers'.
+        white: Policy for white; any object with choose(game, board, moves, rng).
+        black: Policy for black.
+        max_plies (int): Length limit in plies (single moves).
+        rng (random.Random, optional): Source of randomness for the policies.
+        record (list, optional): Every move played is appended to it.
+
+    Returns:
+        tuple: (outcome, plies) where outcome is 'white', 'black' or 'draw'.
+    """
+    rng = rng or random.Random()
+    board = GAMES[game]()
+    players = {'white': white, 'black': black}
+    for ply in range(max_plies):
+        moves = board.generate_moves(board.turn)
+        if not moves:
+            if game == 'chess':
+                return 'draw', ply
+            return ('black' if board.turn == 'white' else 'white'), ply
+        mover = board.turn
+        move = players[mover].choose(game, board, moves, rng)
+        if record is not None:
+            record.append(move)
+        made = board.make_move(*move)
+        if game == 'chess' and made.target is not None and made.pulled_to is None and made.target.name == 'King':
+            return mover, ply + 1
+    return 'draw', max_plies
+
+
+def _play_games(game, white, black, first, count, max_plies, seed):
+    """Plays games number first .. first + count - 1; game i uses the random seed seed + i."""
+    outcomes = {'white': 0, 'black': 0, 'draw': 0}
+    total_plies = 0
+    for index in range(first, first + count):
+        outcome, plies = play_game(game, white, black, max_plies, random.Random(seed + index))
+        outcomes[outcome] += 1
+        total_plies += plies
+    return outcomes, total_plies
+
+
+def simulate(game, white, black, games=100, max_plies=200, workers=1, seed=0):
+    """Plays a series of games and summarises them.
+
+    Args:
+        game (str): 'chess' or 'checkers'.
+        white: Policy for white.
+        black: Policy for black.
+        games (int): Number of games.
+        max_plies (int): Length limit of every game.
+        workers (int): Number of processes to spread the games over.
+        seed (int): Base random seed; the same seed replays the same games.
+
+    Returns:
+        dict: games, seconds, games_per_second, average_length (plies) and outcomes (counts per result).
+    """
+    started = time.perf_counter()
+    if workers <= 1:
+        parts = [_play_games(game, white, black, 0, games, max_plies, seed)]
+    else:
+        chunk = -(-games // workers)
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_play_games, game, white, black, first, min(chunk, games - first), max_plies, seed)
+                       for first in range(0, games, chunk)]
+            parts = [future.result() for future in futures]
+    seconds = time.perf_counter() - started
+
+    outcomes = {'white': 0, 'black': 0, 'draw': 0}
+    total_plies = 0
+    for part_outcomes, plies in parts:
+        for outcome, count in part_outcomes.items():
+            outcomes[outcome] += count
+        total_plies += plies
+    return {
+        'game': game,
+        'white': white.name,
+        'black': black.name,
+        'games': games,
+        'seconds': round(seconds, 6),
+        'games_per_second': round(games / seconds, 3) if seconds > 0 else None,
+        'average_length': total_plies / games if games else 0.0,
+        'outcomes': outcomes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play games between policies without console output.")
+    parser.add_argument('--game', choices=tuple(GAMES), default='chess')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', choices=tuple(POLICIES), default='random')
+    parser.add_argument('--black', choices=tuple(POLICIES), default='random')
+    parser.add_argument('--depth', type=int, default=2, help="search depth of the engine policy")
+    parser.add_argument('--max-plies', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    def policy(name):
+        return EnginePolicy(args.depth) if name == 'engine' else POLICIES[name]()
+
+    if args.game != 'chess' and 'engine' in (args.white, args.black):
+        parser.error("the engine policy only plays chess")
+    report = simulate(args.game, policy(args.white), policy(args.black), args.games, args.max_plies,
+                      args.workers, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['games']} games of {report['game']} ({report['white']} vs {report['black']}) "
+              f"in {report['seconds']:.2f} s: {report['games_per_second']} games/s, "
+              f"average length {report['average_length']:.1f} plies")
+        print("white wins: {white}, black wins: {black}, draws: {draw}".format(**report['outcomes']))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
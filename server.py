@@ -0,0 +1,270 @@
+"""Game server: hosts many chess and checkers games in one process over a line-based text protocol.
+
+Clients connect over TCP or a Unix socket and send one command per line (UTF-8); every command gets
+exactly one reply line, ``OK ...`` or ``ERR <reason>``::
+
+    NEW chess            -> OK 1                   start a game and attach to it; the reply is its id
+    JOIN 1               -> OK chess               attach to an existing game, e.g. as the second player
+    MOVE e2e4            -> OK check               make a move for the side to move; the reply is the game state
+    MOVE c3e5g7          -> OK playing             checkers: a multi-jump lists every square it lands on
+    UNDO                 -> OK playing             take back the last move
+    STATE                -> OK playing <FEN>       game state and position in notation.py text notation
+    QUIT                 -> OK                     close the connection
+
+Game states are those of events.GameState for chess, and 'playing' or 'no_moves' (the side to move has
+lost) for checkers. Refused moves are answered with the value of their events.IllegalMove, e.g.
+``ERR against_rules``. A game stays alive while at least one connection is attached to it.
+
+All games live in the event loop's thread and every command is handled without awaiting, so a command
+never sees a half-made move and no locks are needed. A move costs make_move, an attack map lookup for
+the mover's king and a search for the first legal reply (Board.game_state stops there); working out why
+a move was refused is only done for refused moves. Replies are flushed with drain(), so a slow client
+only holds up its own connection.
+
+Example: ``python server.py --port 7777 --unix /tmp/fa_chess.sock``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+
+from chessboard import Board
+from checker import Board1
+from events import GameState, IllegalMove
+from gamerecord import parse_move
+from notation import to_fen, checkers_to_fen
+
+GAMES = {
+    'chess': Board,
+    'checkers': Board1,
+}
+GAME_OVER = {GameState.CHECKMATE.value, GameState.STALEMATE.value, GameState.KING_CAPTURED.value, 'no_moves'}
+MAX_LINE = 4096
+# Long accept queue: thousands of clients may connect at the same moment
+BACKLOG = 4096
+
+
+class Session:
+    """One hosted game.
+
+    Attributes:
+        id (str): The id clients use to JOIN the game.
+        game (str): 'chess' or 'checkers'.
+        board: The chessboard.Board or checker.Board1 of the game; it has no observers, so nothing is printed.
+        clients (int): Number of connections attached to the game.
+        state (str): The state of the game for the side to move, e.g. 'playing', 'check' or 'checkmate';
+            worked out once after every move and undo.
+    """
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.board = GAMES[game]()
+        self.clients = 0
+        self.state = self._find_state()
+
+    def _find_state(self):
+        if self.game == 'chess':
+            return self.board.game_state().value
+        return 'playing' if self.board.generate_moves(self.board.turn) else 'no_moves'
+
+    def move(self, path):
+        """Makes a move for the side to move.
+
+        Args:
+            path (tuple): (str, int) positions as returned by gamerecord.parse_move.
+
+        Returns:
+            str: The reply line.
+        """
+        if self.state in GAME_OVER:
+            return "ERR game_over"
+        board = self.board
+        if self.game == 'chess':
+            if len(path) != 2:
+                return "ERR bad_arguments"
+            start, end = path
+            piece = board.markup[start[0]][start[1] - 1]
+            if piece is not None and piece.color != board.turn:
+                return f"ERR {IllegalMove.NOT_YOUR_PIECE.value}"
+            made = board.make_move(start, end)
+            if made is None:
+                return f"ERR {board._plan_move(start, end)[1].value}"
+            if board.in_check(piece.color):
+                board.unmake_move()
+                return f"ERR {IllegalMove.KING_LEFT_ATTACKED.value}"
+        else:
+            made = board.make_move(*path)
+            if made is None:
+                reason = board._plan_move(path[0], path[-1], board.turn)[1] or IllegalMove.AGAINST_RULES
+                return f"ERR {reason.value}"
+        self.state = self._find_state()
+        return f"OK {self.state}"
+
+    def undo(self):
+        """Takes back the last move; returns the reply line."""
+        if self.board.unmake_move() is None:
+            return "ERR nothing_to_undo"
+        self.state = self._find_state()
+        return f"OK {self.state}"
+
+    def describe(self):
+        """Returns the reply line to STATE: the game state and the position in text notation."""
+        fen = to_fen(self.board) if self.game == 'chess' else checkers_to_fen(self.board)
+        return f"OK {self.state} {fen}"
+
+
+class GameServer:
+    """Hosts sessions and serves the line protocol described in the module docstring.
+
+    Attributes:
+        sessions (dict): Session id -> Session for every live game.
+        connections (int): Number of open client connections.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.connections = 0
+        self._ids = itertools.count(1)
+
+    def execute(self, line, session):
+        """Runs one command line for a connection attached to session (or None).
+
+        Returns:
+            tuple: (reply line, the session the connection is attached to afterwards). The reply is None
+            for QUIT, which closes the connection.
+        """
+        words = line.split()
+        if not words:
+            return "ERR empty_command", session
+        command, args = words[0].upper(), words[1:]
+        if command == 'QUIT':
+            return None, session
+        if command == 'NEW':
+            if len(args) != 1 or args[0] not in GAMES:
+                return "ERR bad_arguments", session
+            new = Session(str(next(self._ids)), args[0])
+            self.sessions[new.id] = new
+            return f"OK {new.id}", self._attach(session, new)
+        if command == 'JOIN':
+            if len(args) != 1:
+                return "ERR bad_arguments", session
+            joined = self.sessions.get(args[0])
+            if joined is None:
+                return "ERR unknown_session", session
+            return f"OK {joined.game}", self._attach(session, joined)
+        if command not in ('MOVE', 'UNDO', 'STATE'):
+            return "ERR unknown_command", session
+        if session is None:
+            return "ERR no_session", session
+        if command == 'MOVE':
+            if len(args) != 1:
+                return "ERR bad_arguments", session
+            try:
+                path = parse_move(args[0])
+            except ValueError:
+                return "ERR bad_arguments", session
+            return session.move(path), session
+        if args:
+            return "ERR bad_arguments", session
+        if command == 'UNDO':
+            return session.undo(), session
+        return session.describe(), session
+
+    def _attach(self, old, new):
+        if old is new:
+            return new
+        self.detach(old)
+        new.clients += 1
+        return new
+
+    def detach(self, session):
+        """Detaches a connection from session; the game is dropped when nobody is attached to it any more."""
+        if session is None:
+            return
+        session.clients -= 1
+        if session.clients == 0:
+            del self.sessions[session.id]
+
+    async def handle(self, reader, writer):
+        """Serves one client connection until it sends QUIT or disconnects."""
+        self.connections += 1
+        session = None
+        try:
+            while True:
+                try:
+                    data = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write(b"ERR line_too_long\n")
+                    break
+                if not data:
+                    break
+                try:
+                    line = data.decode('utf-8')
+                except UnicodeDecodeError:
+                    reply = "ERR bad_encoding"
+                else:
+                    reply, session = self.execute(line, session)
+                if reply is None:
+                    writer.write(b"OK\n")
+                    break
+                writer.write(reply.encode('utf-8') + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.detach(session)
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host=None, port=None, unix_path=None):
+        """Starts listening on a TCP port and/or a Unix socket.
+
+        Returns:
+            list: The asyncio servers that were started.
+        """
+        servers = []
+        if port is not None:
+            servers.append(await asyncio.start_server(self.handle, host, port, limit=MAX_LINE, backlog=BACKLOG))
+        if unix_path is not None:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            servers.append(await asyncio.start_unix_server(self.handle, unix_path, limit=MAX_LINE,
+                                                           backlog=BACKLOG))
+        return servers
+
+
+async def serve(host, port, unix_path):
+    server = GameServer()
+    servers = await server.start(host, port, unix_path)
+    for listener in servers:
+        for sock in listener.sockets:
+            print(f"Сервер слушает {sock.getsockname()}")
+    await asyncio.gather(*(listener.serve_forever() for listener in servers))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host chess and checkers games over a line-based protocol.")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP address to listen on")
+    parser.add_argument('--port', type=int, help="TCP port to listen on")
+    parser.add_argument('--unix', help="path of a Unix socket to listen on")
+    args = parser.parse_args(argv)
+
+    port = args.port
+    if port is None and args.unix is None:
+        port = 7777
+    try:
+        asyncio.run(serve(args.host, port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Startup benchmark: how long a fresh interpreter takes to import a game and set up its first board.
+
+Every run starts a new Python process, so module caches never carry over between measurements. For each
+target three times are reported, as the median and the fastest of all runs:
+
+* import - importing the game module (with everything it imports);
+* board - creating the first board after the import;
+* process - the whole child process, interpreter start and exit included.
+
+Run ``python startup_bench.py`` for a table or ``python startup_bench.py --json`` for machine-readable
+output. Without up-to-date .pyc files (e.g. with PYTHONDONTWRITEBYTECODE set) the import time includes
+compiling the sources.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# target name -> (module to import, board factory in that module or None)
+TARGETS = {
+    'chess': ('chessboard', 'Board'),
+    'checkers': ('checker', 'Board1'),
+    'menu': ('main', None),
+}
+
+_PROBE = """\
+import time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{create}
+ready = time.perf_counter()
+print(imported - started, ready - imported)
+"""
+
+
+def measure(target):
+    """Starts one fresh interpreter for the target.
+
+    Returns:
+        dict: import, board and process times in seconds.
+    """
+    module, factory = TARGETS[target]
+    create = f"{module}.{factory}()" if factory else "pass"
+    code = _PROBE.format(module=module, create=create)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    process = time.perf_counter() - started
+    import_seconds, board_seconds = map(float, output.split())
+    return {'import': import_seconds, 'board': board_seconds, 'process': process}
+
+
+def run(targets, runs):
+    """Measures every target runs times, alternating between targets so they see the same machine load.
+
+    Returns:
+        list: One record per target with the median and minimum of each time in milliseconds.
+    """
+    samples = {target: [] for target in targets}
+    for _ in range(runs):
+        for target in targets:
+            samples[target].append(measure(target))
+    results = []
+    for target in targets:
+        record = {'target': target, 'runs': runs}
+        for key in ('import', 'board', 'process'):
+            values = [sample[key] * 1000 for sample in samples[target]]
+            record[key + '_ms'] = round(statistics.median(values), 3)
+            record[key + '_min_ms'] = round(min(values), 3)
+        results.append(record)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import and first-board latency of the games.")
+    parser.add_argument('--target', choices=tuple(TARGETS) + ('all',), default='all')
+    parser.add_argument('--runs', type=int, default=10, help="fresh processes per target")
+    parser.add_argument('--json', action='store_true', help="print a JSON report instead of a table")
+    args = parser.parse_args(argv)
+
+    targets = tuple(TARGETS) if args.target == 'all' else (args.target,)
+    results = run(targets, args.runs)
+
+    if args.json:
+        print(json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2))
+    else:
+        print(f"{'target':<10}{'import ms':>13}{'board ms':>13}{'process ms':>13}   (median; fastest in brackets)")
+        for r in results:
+            print(f"{r['target']:<10}"
+                  + ''.join(f"{r[key + '_ms']:>6.1f} ({r[key + '_min_ms']:>4.1f})" for key in ('import', 'board', 'process')))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Checkers endgame tablebases: the exact result of every position with few checkers left.
+
+Tables are built offline by retrograde analysis (``python tablebase.py build --pieces 3``), one file per
+material balance. Every position has a fixed index in its table, so a lookup reads two bytes from a
+memory-mapped file: nothing is searched and no table is loaded into memory.
+
+File format: a 16-byte header (magic ``CKTB``, format version, the four piece counts of the material
+balance, padding and the number of entries), followed by one little-endian 16-bit entry per position.
+The top two bits of an entry are the result for the side to move (DRAW, WIN, LOSS or INVALID) and the
+low 14 bits the number of plies until the game is won or lost with best play.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations, product
+from math import comb
+
+from checker import Board1, STEPS, FORWARD, ALL_DIRECTIONS, PROMOTION, iter_bits
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+INVALID = 3  # indexes that are not a position: checkers on the same square or a man on its last row
+
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sB4B3xI')
+ENTRY = struct.Struct('<H')
+DISTANCE_MASK = (1 << 14) - 1
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+
+# Направления, по которым простая шашка могла прийти на поле (назад относительно ее хода)
+BACKWARD = {'white': FORWARD['black'], 'black': FORWARD['white']}
+OTHER = {'white': 'black', 'black': 'white'}
+
+
+def _count(mask):
+    return bin(mask).count('1')
+
+
+def signature(white, black, kings):
+    """Returns the material balance (white men, white kings, black men, black kings) of a position."""
+    return (_count(white & ~kings), _count(white & kings), _count(black & ~kings), _count(black & kings))
+
+
+def table_size(material):
+    """Returns the number of entries in the table of a material balance (both sides to move)."""
+    size = 2
+    for pieces in material:
+        size *= comb(32, pieces)
+    return size
+
+
+def file_name(material):
+    """Returns the file name of a table, e.g. '1011.cktb' for a white man against a black man and king."""
+    return ''.join(str(pieces) for pieces in material) + '.cktb'
+
+
+def position_index(material, white, black, kings, turn):
+    """Returns the index of a position in the table of its material balance.
+
+    The index is the side to move followed by the rank of every group of identical checkers
+    (white men, white kings, black men, black kings) among the combinations of 32 squares.
+    """
+    index = 0 if turn == 'white' else 1
+    for mask, pieces in zip((white & ~kings, white & kings, black & ~kings, black & kings), material):
+        rank = 0
+        for j, square in enumerate(iter_bits(mask)):
+            rank += comb(square, j + 1)
+        index = index * comb(32, pieces) + rank
+    return index
+
+
+def materials(max_pieces):
+    """Lists the material balances with 2..max_pieces checkers, both sides present, in build order.
+
+    A capture leads to a balance with fewer checkers and a promotion to one with fewer men, so every
+    position a table's moves lead to outside the table is in a table listed before it.
+    """
+    found = []
+    for material in product(range(max_pieces + 1), repeat=4):
+        total = sum(material)
+        if total <= max_pieces and material[0] + material[1] and material[2] + material[3]:
+            found.append(material)
+    found.sort(key=lambda m: (sum(m), m[0] + m[2], m))
+    return found
+
+
+def _placements(pieces):
+    # Маски всех расстановок pieces одинаковых шашек в порядке их ранга (колексикографическом)
+    return [sum(1 << square for square in squares)
+            for squares in sorted(combinations(range(32), pieces), key=lambda squares: squares[::-1])]
+
+
+def _lookup(solved, white, black, kings, turn):
+    # (результат, число полуходов) позиции из уже построенной таблицы; сторона без шашек проиграла
+    if not (white if turn == 'white' else black):
+        return LOSS, 0
+    material = signature(white, black, kings)
+    entry = solved[material][position_index(material, white, black, kings, turn)]
+    return entry >> 14, entry & DISTANCE_MASK
+
+
+def _predecessors(white, black, kings, turn):
+    # Позиции, из которых соперник простым ходом (без взятия и превращения) пришел в данную
+    mover = OTHER[turn]
+    own = white if mover == 'white' else black
+    empty = ~(white | black) & 0xFFFFFFFF
+    for square in iter_bits(own):
+        is_king = kings >> square & 1
+        for direction in ALL_DIRECTIONS if is_king else BACKWARD[mover]:
+            origin = STEPS[square][direction]
+            if origin < 0 or not empty >> origin & 1:
+                continue
+            moved = own & ~(1 << square) | 1 << origin
+            moved_kings = kings & ~(1 << square) | 1 << origin if is_king else kings
+            if mover == 'white':
+                yield moved, black, moved_kings, mover
+            else:
+                yield white, moved, moved_kings, mover
+
+
+def solve(material, solved):
+    """Builds the table of one material balance by retrograde analysis.
+
+    Moves that capture or promote leave the table and are looked up in solved. Positions are then
+    resolved in order of their distance to the end of the game, walking from every resolved position
+    back to the positions that lead to it: the predecessor of a loss is a win one ply further, and a
+    position whose moves all lead to wins of the opponent is a loss. What is never resolved is a draw.
+
+    Args:
+        material (tuple): (white men, white kings, black men, black kings).
+        solved (dict): Tables of the balances listed before this one by materials(), as arrays of entries.
+
+    Returns:
+        array: One 16-bit entry per index, see the module docstring.
+    """
+    size = table_size(material)
+    entries = array('H', [INVALID << 14]) * size
+    resolved = bytearray(size)
+    remaining = array('i', [0]) * size  # ходы внутри таблицы, еще не оказавшиеся выигрышем соперника
+    loss_distance = array('H', [0]) * size
+    can_escape = bytearray(size)  # есть ход к ничьей или выигрышу: проигрышем позиция быть не может
+    buckets = [[]]
+
+    def push(distance, index, result):
+        while len(buckets) <= distance:
+            buckets.append([])
+        buckets[distance].append((index, result))
+
+    board = Board1()
+    white_men, white_kings, black_men, black_kings = (_placements(pieces) for pieces in material)
+    index = -1
+    for turn, wm, wk, bm, bk in product(('white', 'black'), white_men, white_kings, black_men, black_kings):
+        index += 1
+        if wm & wk or bm & bk or (wm | wk) & (bm | bk) or wm & PROMOTION['white'] or bm & PROMOTION['black']:
+            continue
+        entries[index] = DRAW << 14
+        board.white, board.black, board.kings, board.turn = wm | wk, bm | bk, wk | bk, turn
+        moves = board._legal(turn)
+        if not moves:
+            push(0, index, LOSS)
+            continue
+
+        inside = 0
+        win = None
+        for path, captured in moves:
+            promotes = not board.kings >> path[0] & 1 and PROMOTION[turn] >> path[-1] & 1
+            if not captured and not promotes:
+                inside += 1
+                continue
+            board._apply(path, captured)
+            result, distance = _lookup(solved, board.white, board.black, board.kings, board.turn)
+            board.unmake_move()
+            if result == LOSS:
+                win = distance + 1 if win is None else min(win, distance + 1)
+            elif result == WIN:
+                loss_distance[index] = max(loss_distance[index], distance + 1)
+            else:
+                can_escape[index] = 1
+        remaining[index] = inside
+        if win is not None:
+            can_escape[index] = 1
+            push(win, index, WIN)
+        elif not inside and not can_escape[index]:
+            push(loss_distance[index], index, LOSS)
+
+    distance = 0
+    while distance < len(buckets):
+        for index, result in buckets[distance]:
+            if resolved[index]:
+                continue
+            resolved[index] = 1
+            entries[index] = result << 14 | distance
+            turn, wm, wk, bm, bk = _unindex(material, index)
+            for white, black, kings, mover in _predecessors(wm | wk, bm | bk, wk | bk, turn):
+                previous = position_index(material, white, black, kings, mover)
+                if resolved[previous]:
+                    continue
+                board.white, board.black, board.kings = white, black, kings
+                moves = board._legal(mover)
+                if moves[0][1]:
+                    continue  # у соперника было обязательное взятие, простой ход невозможен
+                if result == LOSS:
+                    push(distance + 1, previous, WIN)
+                else:
+                    remaining[previous] -= 1
+                    loss_distance[previous] = max(loss_distance[previous], distance + 1)
+                    if not remaining[previous] and not can_escape[previous]:
+                        push(loss_distance[previous], previous, LOSS)
+        buckets[distance] = None
+        distance += 1
+    return entries
+
+
+def _unindex(material, index):
+    # Обратное к position_index: (сторона, белые простые, белые дамки, черные простые, черные дамки)
+    masks = []
+    for pieces in reversed(material):
+        index, rank = divmod(index, comb(32, pieces))
+        mask = 0
+        for j in range(pieces, 0, -1):
+            square = j - 1
+            while comb(square + 1, j) <= rank:
+                square += 1
+            rank -= comb(square, j)
+            mask |= 1 << square
+        masks.append(mask)
+    wm, wk, bm, bk = reversed(masks)
+    return ('white' if index == 0 else 'black'), wm, wk, bm, bk
+
+
+def write_table(path, material, entries):
+    """Writes a table file (see the module docstring for the format)."""
+    if sys.byteorder != 'little':
+        entries = array('H', entries)
+        entries.byteswap()
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, *material, len(entries)))
+        entries.tofile(file)
+
+
+def build(max_pieces=3, directory=DEFAULT_DIRECTORY, report=None):
+    """Builds the tables of every material balance with up to max_pieces checkers.
+
+    Args:
+        max_pieces (int): Largest number of checkers on the board.
+        directory (str): Where to write the files; created if missing.
+        report (callable, optional): Called with (material, entries, seconds) after every table.
+
+    Returns:
+        list: The file paths written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    solved = {}
+    paths = []
+    for material in materials(max_pieces):
+        started = time.perf_counter()
+        solved[material] = solve(material, solved)
+        path = os.path.join(directory, file_name(material))
+        write_table(path, material, solved[material])
+        paths.append(path)
+        if report is not None:
+            report(material, solved[material], time.perf_counter() - started)
+    return paths
+
+
+class Tablebase:
+    """Read access to the tablebase files of a directory.
+
+    Files are opened and memory-mapped the first time a position of their material balance is probed;
+    a probe then reads a single entry, so only the pages actually touched are loaded by the system.
+
+    Attributes:
+        directory (str): Where the table files are.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self._tables = {}
+
+    def close(self):
+        """Unmaps and closes every open table."""
+        for table in self._tables.values():
+            if table is not None:
+                table[1].close()
+                table[0].close()
+        self._tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _table(self, material):
+        if material not in self._tables:
+            path = os.path.join(self.directory, file_name(material))
+            if not os.path.exists(path):
+                self._tables[material] = None
+                return None
+            file = open(path, 'rb')
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, *counts, entries = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION or tuple(counts) != material or entries != table_size(material):
+                data.close()
+                file.close()
+                raise ValueError(f"{path} is not a version {VERSION} table of {material}")
+            self._tables[material] = (file, data)
+        table = self._tables[material]
+        return None if table is None else table[1]
+
+    def probe(self, board):
+        """Looks the position of a checker.Board1 up, with board.turn to move.
+
+        Returns:
+            tuple: (result, plies) where result is WIN, LOSS or DRAW for the side to move and plies the
+            length of the game with best play, or None if the position is not in the tables.
+        """
+        white, black, kings, turn = board.white, board.black, board.kings, board.turn
+        if not (white if turn == 'white' else black):
+            return LOSS, 0
+        material = signature(white, black, kings)
+        data = self._table(material)
+        if data is None:
+            return None
+        index = position_index(material, white, black, kings, turn)
+        entry, = ENTRY.unpack_from(data, HEADER.size + ENTRY.size * index)
+        if entry >> 14 == INVALID:
+            return None
+        return entry >> 14, entry & DISTANCE_MASK
+
+    def best_move(self, board):
+        """Returns the move (a path as from Board1.generate_moves) that keeps the best result, or None.
+
+        A won position is won as fast as possible and a lost one defended as long as possible.
+        """
+        value = self.probe(board)
+        if value is None:
+            return None
+        result, plies = value
+        best = None
+        best_key = None
+        for move in board.generate_moves(board.turn):
+            board.make_move(*move)
+            child = self.probe(board)
+            board.unmake_move()
+            if child is None:
+                return None
+            child_result, child_plies = child
+            if result == WIN and child_result == LOSS:
+                key = child_plies
+            elif result == LOSS:
+                key = -child_plies
+            elif result == DRAW and child_result == DRAW:
+                key = 0
+            else:
+                continue
+            if best_key is None or key < best_key:
+                best, best_key = move, key
+        return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checkers endgame tablebases.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="build the tables by retrograde analysis")
+    build_parser.add_argument('--pieces', type=int, default=3, help="largest number of checkers (default: 3)")
+    build_parser.add_argument('--dir', default=DEFAULT_DIRECTORY, help="directory for the table files")
+    args = parser.parse_args(argv)
+
+    def report(material, entries, seconds):
+        counts = [0, 0, 0, 0]
+        for entry in entries:
+            counts[entry >> 14] += 1
+        print(f"{file_name(material):<12}{len(entries):>10} positions  wins {counts[WIN]:>8}  "
+              f"losses {counts[LOSS]:>8}  draws {counts[DRAW]:>8}  {seconds:8.2f} s")
+
+    build(args.pieces, args.dir, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
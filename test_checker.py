@@ -0,0 +1,58 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from checker import Board1, Checker
+
+# Белая дамка на c5 может попасть на c1, взяв две или четыре шашки
+TWO_CHAINS = {
+    'c5': ('white', True), 'a1': ('white', False),
+    'd2': ('black', False), 'd6': ('black', False), 'f6': ('black', False),
+    'b8': ('black', True), 'd8': ('black', True), 'f4': ('black', True), 'd4': ('black', True),
+}
+
+
+def position():
+    board = Board1()
+    board.setup({(name[0], int(name[1])): Checker(color, king) for name, (color, king) in TWO_CHAINS.items()})
+    return board
+
+
+class ChainChoiceTest(unittest.TestCase):
+
+    def test_both_apis_take_the_longest_chain(self):
+        by_make_move = position().make_move(('c', 5), ('c', 1))
+        by_move_figure = position().move_figure(('c', 5), ('c', 1), 'white').move
+        self.assertEqual(len(by_make_move.path), 5)
+        self.assertEqual(by_make_move.path, by_move_figure.path)
+        self.assertEqual(by_make_move.captured, by_move_figure.captured)
+
+    def test_order_of_the_chains_does_not_matter(self):
+        board = position()
+        chains = list(reversed(board._legal('white')))
+        board._legal = lambda turn: chains
+        self.assertEqual(len(board.make_move(('c', 5), ('c', 1)).path), 5)
+
+    def test_full_path_picks_the_shorter_chain(self):
+        move = position().make_move(('c', 5), ('e', 3), ('c', 1))
+        self.assertEqual(len(move.path), 3)
+
+
+class ConsoleTest(unittest.TestCase):
+
+    def test_play_unsubscribes_its_console(self):
+        board = Board1()
+        for _ in range(2):
+            output = io.StringIO()
+            # ввод кончается после одного хода
+            with mock.patch('builtins.input', side_effect=['c3', 'd4', EOFError]), \
+                    contextlib.redirect_stdout(output), self.assertRaises(EOFError):
+                board.play()
+            self.assertEqual(board.observers, ())
+            board.unmake_move()
+            self.assertEqual(output.getvalue().count("Ход выполнен"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from chessboard import Board, King, Princess, SQUARES
+from events import GameState
+from gamerecord import GameRecord
+from notation import to_fen
+
+# магнит a2 притягивает черный магнит a7 на a6, затем принцесса c1 съедает пешку на b6
+PULL_AND_CAPTURE = [(('a', 2), ('a', 7)), (('b', 7), ('b', 6)), (('c', 1), ('b', 6)), (('g', 7), ('g', 6)),
+                    (('g', 2), ('g', 3))]
+OPENING = ['b2', 'b3', 'b7', 'b6', 'g2', 'g3', 'g7', 'g6']
+
+
+def position(board):
+    """Everything a move can change: the piece on every square, the side to move, the move count and the hash."""
+    return [board.markup[col][row - 1] for col, row in SQUARES], board.turn, board.move_count, board.hash
+
+
+class HashTest(unittest.TestCase):
+
+    def test_hash_is_kept_up_to_date_by_moves_and_undos(self):
+        board = Board()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for move in PULL_AND_CAPTURE:
+                self.assertTrue(board.move_figure(*move))
+                self.assertEqual(board.hash, board.compute_hash())
+            while board.history:
+                board.undo_move(board.turn)
+                self.assertEqual(board.hash, board.compute_hash())
+
+
+class MakeUnmakeTest(unittest.TestCase):
+
+    def test_unmake_restores_pulls_and_princess_captures_exactly(self):
+        board = Board()
+        positions = []
+        for move in PULL_AND_CAPTURE:
+            positions.append(position(board))
+            self.assertIsNotNone(board.make_move(*move))
+            self.assertEqual(board.hash, board.compute_hash())
+        self.assertIs(board.markup['a'][5], positions[0][0][SQUARES.index(('a', 7))])
+        # притянутый магнит вернулся на a7, съеденная пешка - на b6, принцесса снова не ела
+        for expected in reversed(positions):
+            self.assertIsNotNone(board.unmake_move())
+            self.assertEqual(position(board), expected)
+        self.assertIsNone(board.unmake_move())
+
+
+class CopyTest(unittest.TestCase):
+
+    def test_copy_is_independent_of_the_board(self):
+        board = Board()
+        for move in PULL_AND_CAPTURE:
+            board.make_move(*move)
+        clone = board.copy()
+        self.assertEqual(position(clone), position(board))
+        before = position(board)
+        self.assertIsNotNone(clone.make_move(('e', 7), ('e', 6)))
+        self.assertEqual(clone.hash, clone.compute_hash())
+        self.assertEqual(clone.legal_moves(), clone.copy().legal_moves())
+        self.assertEqual(position(board), before)
+        self.assertIsNotNone(clone.unmake_move())
+        self.assertEqual(position(clone), before)
+
+
+class OpeningTest(unittest.TestCase):
+
+    def test_opening_is_played_past_the_first_move(self):
+        board = Board()
+        for index in range(0, len(OPENING), 2):
+            self.assertEqual(board.game_state(), GameState.PLAYING)
+            self.assertTrue(board.legal_moves())
+            start, end = OPENING[index], OPENING[index + 1]
+            self.assertTrue(board.move_figure((start[0], int(start[1])), (end[0], int(end[1]))))
+        self.assertEqual(board.game_state(), GameState.PLAYING)
+
+    def test_console_game_goes_on_after_the_first_move(self):
+        board = Board()
+        # после дебюта пустая строка завершает партию
+        with mock.patch('builtins.input', side_effect=OPENING + ['']), contextlib.redirect_stdout(io.StringIO()):
+            board.Whose_move()
+        self.assertEqual(board.move_count, len(OPENING) // 2)
+
+
+class PrincessTest(unittest.TestCase):
+
+    def test_princess_that_has_not_eaten_captures_a_king_without_checking_it(self):
+        board = Board()
+        board.setup({('c', 1): Princess('white'), ('e', 1): King('white'), ('e', 8): King('black')})
+        self.assertFalse(board.in_check('black'))
+        self.assertIn((('c', 1), ('e', 8)), board.generate_moves('white'))
+        self.assertIsNotNone(board.make_move(('c', 1), ('e', 8)))
+        self.assertIsNone(board.find_king('black'))
+
+    def test_princess_that_has_eaten_checks_a_king_next_to_her(self):
+        pieces = {('d', 7): Princess('white'), ('e', 1): King('white'), ('e', 8): King('black')}
+        board = Board()
+        board.setup(pieces, eaten=[('d', 7)])
+        self.assertTrue(board.in_check('black'))
+        board.setup(pieces, move_count=1, eaten=[('d', 7)])
+        self.assertFalse(board.in_check('black'))
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def play(self, board, plies):
+        positions = [to_fen(board)]
+        for ply in range(plies):
+            # ходы берутся по номеру, а не случайно, чтобы партия была одной и той же при каждом запуске
+            self.assertTrue(board.move_figure(*board.legal_moves()[ply % 3]))
+            positions.append(to_fen(board))
+        return positions
+
+    def test_goto_undo_and_redo_reach_the_same_positions(self):
+        board = Board()
+        positions = self.play(board, 40)
+        for ply in (3, 37, 0, 40, 17):
+            board.goto_ply(ply)
+            self.assertEqual(to_fen(board), positions[ply])
+            self.assertEqual(board.hash, board.compute_hash())
+        self.assertEqual(board.undo_moves(10), 7)
+        self.assertEqual(board.redo_moves(100), 40)
+        self.assertEqual(to_fen(board), positions[40])
+
+    def test_exporting_a_game_keeps_the_redo_line(self):
+        board = Board()
+        positions = self.play(board, 40)
+        board.undo_moves(20)
+        record = GameRecord.from_board(board)
+        self.assertEqual(len(record.moves), 20)
+        self.assertEqual(board.redo_moves(20), 40)
+        self.assertEqual(to_fen(board), positions[40])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from chessboard import Board, King, Queen
+from engine import Engine, MATE_BOUND
+
+
+def stalemate():
+    """Black to move with only a king on h8, which is not attacked but cannot step anywhere safe."""
+    board = Board()
+    board.setup({('h', 8): King('black'), ('g', 6): Queen('white'), ('e', 1): King('white')}, 'black', 1)
+    return board
+
+
+class StalemateTest(unittest.TestCase):
+
+    def test_stalemated_side_scores_a_draw(self):
+        for depth in (2, 3):
+            self.assertEqual(Engine().search(stalemate(), depth=depth).score, 0)
+
+    def test_move_into_stalemate_is_not_a_mate(self):
+        board = Board()
+        # ферзь g5 -> g6 ставит пат, а не мат
+        board.setup({('h', 8): King('black'), ('g', 5): Queen('white'), ('e', 1): King('white')}, 'white', 0)
+        result = Engine().search(board, depth=3)
+        self.assertLess(abs(result.score), MATE_BOUND)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import io
+import unittest
+
+from chessboard import Board
+from checker import Board1
+from gamerecord import GameRecord, read_games, write_games, replay
+from notation import to_fen
+
+# пример из описания модуля
+SAMPLE = '''[Game "chess"]
+[Result "*"]
+[FEN "rniqkbnr/m1pppppa/1p6/8/8/1P6/M1PPPPPA/RNIQKBNR w 2 -"]
+
+1. g2g3 g7g6 2. f1g2 f8g7 *
+'''
+
+
+def records():
+    chess = Board()
+    for move in ((('b', 2), ('b', 3)), (('b', 7), ('b', 6)), (('a', 2), ('a', 7))):
+        chess.make_move(*move)
+    yield GameRecord.from_board(chess, '1-0', {'Event': 'a "quoted" \\ name'})
+    # партия не с начальной позиции получает тег FEN
+    yield GameRecord.from_board(replay(next(read_games(io.StringIO(SAMPLE))))[0])
+    checkers = Board1()
+    for move in ((('c', 3), ('d', 4)), (('f', 6), ('e', 5)), (('d', 4), ('f', 6))):
+        checkers.make_move(*move)
+    yield GameRecord.from_board(checkers, '*')
+
+
+class GameRecordTest(unittest.TestCase):
+
+    def test_sample_game_replays(self):
+        record, = read_games(io.StringIO(SAMPLE))
+        board, error = replay(record)
+        self.assertIsNone(error)
+        self.assertEqual(to_fen(board), "rniqk1nr/m1ppppba/1p4p1/8/8/1P4P1/M1PPPPBA/RNIQK1NR w 6 -")
+
+    def test_written_games_read_back_the_same(self):
+        written = list(records())
+        self.assertIn('FEN', written[1].tags)
+        file = io.StringIO()
+        self.assertEqual(write_games(file, written), len(written))
+        file.seek(0)
+        read = list(read_games(file))
+        self.assertEqual([(record.tags, record.moves) for record in read],
+                         [(record.tags, record.moves) for record in written])
+        for record in read:
+            self.assertIsNone(replay(record)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from chessboard import Board
+from checker import Board1, Checker
+from notation import to_fen, from_fen, pack, unpack, checkers_to_fen, checkers_from_fen, pack_checkers, unpack_checkers
+
+# притягивание магнитом, взятие принцессой (она становится съевшей) и позиции с ходом черных
+CHESS_MOVES = [(('a', 2), ('a', 7)), (('b', 7), ('b', 6)), (('c', 1), ('b', 6)), (('g', 7), ('g', 6))]
+CHECKERS_POSITION = {('a', 1): Checker('white'), ('c', 3): Checker('white', True),
+                     ('d', 6): Checker('black'), ('h', 8): Checker('black', True)}
+
+
+def chess_positions():
+    board = Board()
+    yield board
+    for move in CHESS_MOVES:
+        board.make_move(*move)
+        yield board
+
+
+def checkers_positions():
+    yield Board1()
+    board = Board1()
+    board.setup(CHECKERS_POSITION, 'black', 7)
+    yield board
+
+
+class ChessNotationTest(unittest.TestCase):
+
+    def test_text_round_trip(self):
+        for board in chess_positions():
+            text = to_fen(board)
+            restored = from_fen(text)
+            self.assertEqual(to_fen(restored), text)
+            self.assertEqual(restored.hash, board.hash)
+
+    def test_binary_round_trip(self):
+        for board in chess_positions():
+            data = pack(board)
+            restored = unpack(data)
+            self.assertEqual(pack(restored), data)
+            # от счетчика ходов в двоичной записи остается только четность, а хеш зависит только от нее
+            self.assertEqual(restored.hash, board.hash)
+            self.assertEqual(to_fen(restored).split()[0], to_fen(board).split()[0])
+
+
+class CheckersNotationTest(unittest.TestCase):
+
+    def test_text_round_trip(self):
+        for board in checkers_positions():
+            text = checkers_to_fen(board)
+            self.assertEqual(checkers_to_fen(checkers_from_fen(text)), text)
+
+    def test_binary_round_trip(self):
+        for board in checkers_positions():
+            restored = unpack_checkers(pack_checkers(board))
+            self.assertEqual((restored.white, restored.black, restored.kings, restored.turn),
+                             (board.white, board.black, board.kings, board.turn))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from server import GameServer
+
+OPENING = ['b2b3', 'b7b6', 'g2g3', 'g7g6', 'c2c3', 'c7c6']
+
+
+class ProtocolTest(unittest.TestCase):
+
+    def test_chess_game_is_played_for_several_plies(self):
+        server = GameServer()
+        reply, white = server.execute("NEW chess", None)
+        self.assertEqual(reply, "OK 1")
+        reply, black = server.execute("JOIN 1", None)
+        self.assertEqual(reply, "OK chess")
+        for index, move in enumerate(OPENING):
+            session = white if index % 2 == 0 else black
+            self.assertEqual(server.execute(f"MOVE {move}", session)[0], "OK playing")
+        reply, _ = server.execute("STATE", white)
+        self.assertEqual(reply, "OK playing rniqkbnr/m2ppp1a/1pp3p1/8/8/1PP3P1/M2PPP1A/RNIQKBNR w 6 -")
+        self.assertEqual(server.execute("UNDO", black)[0], "OK playing")
+        self.assertEqual(server.execute("MOVE c7c5", black)[0], "ERR against_rules")
+        self.assertEqual(server.execute("MOVE c7c6", black)[0], "OK playing")
+
+    def test_refused_moves(self):
+        server = GameServer()
+        _, session = server.execute("NEW chess", None)
+        self.assertEqual(server.execute("MOVE b7b6", session)[0], "ERR not_your_piece")
+        self.assertEqual(server.execute("MOVE e5e6", session)[0], "ERR no_piece")
+        self.assertEqual(server.execute("MOVE b2", session)[0], "ERR bad_arguments")
+        self.assertEqual(server.execute("UNDO", session)[0], "ERR nothing_to_undo")
+
+    def test_checkers_multi_jump_notation(self):
+        server = GameServer()
+        _, session = server.execute("NEW checkers", None)
+        self.assertEqual(server.execute("MOVE c3d4", session)[0], "OK playing")
+        self.assertEqual(server.execute("MOVE f6e5", session)[0], "OK playing")
+
+
+class ConnectionTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_two_clients_play_over_tcp(self):
+        server = GameServer()
+        listeners = await server.start('127.0.0.1', 0)
+        port = listeners[0].sockets[0].getsockname()[1]
+        try:
+            white = await asyncio.open_connection('127.0.0.1', port)
+            black = await asyncio.open_connection('127.0.0.1', port)
+
+            async def send(client, line):
+                reader, writer = client
+                writer.write(line.encode() + b"\n")
+                return (await reader.readline()).decode().strip()
+
+            game = (await send(white, "NEW chess")).split()[1]
+            self.assertEqual(await send(black, f"JOIN {game}"), "OK chess")
+            for index, move in enumerate(OPENING):
+                self.assertEqual(await send(white if index % 2 == 0 else black, f"MOVE {move}"), "OK playing")
+            self.assertEqual(await send(white, "QUIT"), "OK")
+            self.assertEqual(await send(black, "QUIT"), "OK")
+            for _, writer in (white, black):
+                writer.close()
+                await writer.wait_closed()
+        finally:
+            for listener in listeners:
+                listener.close()
+                await listener.wait_closed()
+        self.assertEqual(server.sessions, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import io
+import unittest
+
+from notation import to_fen
+from uci import UciEngine
+
+
+class PositionTest(unittest.TestCase):
+
+    def test_moves_are_played_from_the_start_position(self):
+        output = io.StringIO()
+        uci = UciEngine(output)
+        uci.handle("position startpos moves b2b3 b7b6")
+        self.assertEqual(to_fen(uci.board), "rniqkbnr/m1pppppa/1p6/8/8/1P6/M1PPPPPA/RNIQKBNR w 2 -")
+        self.assertEqual(output.getvalue(), "")
+
+    def test_bad_or_illegal_move_keeps_the_previous_position(self):
+        for line, error in (("position startpos moves b2b3 b7", "bad move b7"),
+                            ("position startpos moves b2b3 b2b4", "illegal move b2b4")):
+            output = io.StringIO()
+            uci = UciEngine(output)
+            uci.handle("position startpos moves g2g3")
+            before = to_fen(uci.board)
+            uci.handle(line)
+            self.assertEqual(to_fen(uci.board), before)
+            self.assertEqual(output.getvalue(), f"info string {error}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+    """Fixed-size cache of analysis results keyed by the Zobrist hash of a position (Board.hash).
+
+    The table has a power-of-two number of slots and each slot holds one entry. When two positions
+    compete for a slot, the entry searched to a greater depth wins, except that entries left over
+    from an earlier search (see new_search) are always replaced.
+
+    Attributes:
+        size (int): Number of slots.
+        age (int): Number of the current search; entries remember the search that stored them.
+        hits (int): Probes that found an entry for the requested key.
+        misses (int): Probes that found nothing.
+        stores (int): Entries written.
+        overwrites (int): Stores that evicted an entry of another position.
+    """
+
+    def __init__(self, size=1 << 16):
+        """Creates an empty table.
+
+        Args:
+            size (int): Requested number of slots, rounded up to a power of two.
+        """
+        slots = 1
+        while slots < size:
+            slots <<= 1
+        self.size = slots
+        self._mask = slots - 1
+        self._slots = [None] * slots
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """Looks up the entry of a position.
+
+        Args:
+            key (int): Zobrist hash of the position.
+
+        Returns:
+            tuple: (depth, value, flag, move) if the position is stored, otherwise None.
+        """
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, flag=EXACT, move=None):
+        """Saves a result, unless the slot holds a deeper result of the current search for another position.
+
+        Args:
+            key (int): Zobrist hash of the position.
+            depth (int): Depth the value was computed to.
+            value: The stored result, for example a search score.
+            flag (int): EXACT, LOWER (value is a lower bound) or UPPER (value is an upper bound).
+            move: The best move found, if any.
+
+        Returns:
+            bool: True if the entry was written.
+        """
+        index = key & self._mask
+        entry = self._slots[index]
+        if entry is not None and entry[0] != key:
+            if entry[5] == self.age and entry[1] > depth:
+                return False
+            self.overwrites += 1
+        self._slots[index] = (key, depth, value, flag, move, self.age)
+        self.stores += 1
+        return True
+
+    def new_search(self):
+        """Marks every stored entry as old, so it yields its slot to any new result."""
+        self.age += 1
+
+    def clear(self):
+        """Removes all entries and resets the counters."""
+        self._slots = [None] * self.size
+        self.age = 0
+        self.hits = self.misses = self.stores = self.overwrites = 0
+
+    def stats(self):
+        """Returns the counters as a dict, together with the hit rate and the number of filled slots."""
+        probes = self.hits + self.misses
+        return {
+            'size': self.size,
+            'filled': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+        }
+
+    def __len__(self):
+        return self.size - self._slots.count(None)
+
+    def __contains__(self, key):
+        entry = self._slots[key & self._mask]
+        return entry is not None and entry[0] == key
@@ -0,0 +1,268 @@
+"""UCI-style engine protocol on standard input and output, so external tools can drive the chess variant.
+
+The commands are those of UCI: ``uci``, ``isready``, ``ucinewgame``, ``position``, ``go``, ``stop``,
+``ponderhit`` and ``quit``. Two things differ because of the variant:
+
+* ``position fen`` takes the text notation of notation.py: the usual piece letters plus M (magnet),
+  A (kangaroo) and I (princess), the side to move, the move count (its parity matters to princesses) and
+  the squares of the princesses that have already eaten, e.g.
+  ``position fen rniqkbnr/mppppppa/8/8/8/8/MPPPPPPA/RNIQKBNR w 0 - moves b2b3``;
+* moves are plain square pairs like ``e2e4`` (no promotions or castling), checked with Board's rules.
+
+``go`` accepts ``wtime``, ``btime``, ``winc``, ``binc``, ``movestogo``, ``movetime``, ``depth``, ``nodes``,
+``infinite`` and ``ponder``. The search runs on a background thread, so ``stop`` is handled while it runs
+and the search ends within engine.CHECK_INTERVAL nodes (a few milliseconds).
+
+Example: ``python uci.py``, then type ``position startpos`` and ``go movetime 1000``.
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from chessboard import Board
+from engine import Engine, MATE, MATE_BOUND
+from gamerecord import format_move, parse_move
+from notation import from_fen
+from transposition import TranspositionTable
+
+ENGINE_NAME = 'FA_chess'
+ENGINE_AUTHOR = 'Leshatop228'
+# Without movestogo the remaining time is shared out as if this many moves were left.
+DEFAULT_MOVES_TO_GO = 30
+# Seconds kept back from every budget for passing the answer through the pipe.
+SAFETY_MARGIN = 0.05
+MIN_BUDGET = 0.01
+
+_GO_NUMBERS = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'movetime', 'depth', 'nodes')
+_TIME_LIMITS = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'movetime')
+
+
+def parse_go(words):
+    """Parses the arguments of ``go`` into a dict; flags (infinite, ponder) map to True.
+
+    Raises:
+        ValueError: If a numeric argument is missing or not a number.
+    """
+    limits = {}
+    words = list(words)
+    while words:
+        word = words.pop(0)
+        if word in ('infinite', 'ponder'):
+            limits[word] = True
+        elif word in _GO_NUMBERS:
+            if not words:
+                raise ValueError(f"{word} needs a value")
+            limits[word] = int(words.pop(0))
+    return limits
+
+
+def time_budget(limits, turn):
+    """Returns the seconds to spend on a move under the limits of ``go``, or None if time is not limited.
+
+    Args:
+        limits (dict): As returned by parse_go.
+        turn (str): The side to move, whose clock counts.
+    """
+    if 'movetime' in limits:
+        return max(limits['movetime'] / 1000 - SAFETY_MARGIN, MIN_BUDGET)
+    clock = limits.get('wtime' if turn == 'white' else 'btime')
+    if clock is None:
+        return None
+    increment = limits.get('winc' if turn == 'white' else 'binc', 0)
+    moves_to_go = limits.get('movestogo') or DEFAULT_MOVES_TO_GO
+    budget = clock / 1000 / moves_to_go + increment / 1000 * 0.8
+    # never plan to use more than half of what is left on the clock
+    return max(min(budget, clock / 1000 / 2) - SAFETY_MARGIN, MIN_BUDGET)
+
+
+def score_text(score):
+    """Formats an engine score as UCI does: 'cp <centipawns>' or 'mate <moves>' (negative if being mated)."""
+    if abs(score) >= MATE_BOUND:
+        plies = MATE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+class UciEngine:
+    """Protocol state: the current position, the engine and the background search.
+
+    Attributes:
+        board (Board): The position set by the last ``position`` command.
+        engine (Engine): The searcher; its transposition table is kept between moves of a game.
+    """
+
+    def __init__(self, output=None, engine=None):
+        """Creates the protocol handler.
+
+        Args:
+            output (file, optional): Where replies are written; standard output by default.
+            engine (Engine, optional): The searcher; a new Engine by default.
+        """
+        self.board = Board()
+        self.engine = engine or Engine()
+        self._output = output or sys.stdout
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stop = None
+        self._release = None
+        self._ponder_limits = None
+
+    def send(self, line):
+        """Writes one reply line; safe to call from the search thread."""
+        with self._write_lock:
+            self._output.write(line + '\n')
+            self._output.flush()
+
+    def handle(self, line):
+        """Handles one input line.
+
+        Returns:
+            bool: False after ``quit``, True otherwise.
+        """
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.stop()
+            self.engine.tt = TranspositionTable(self.engine.tt.size)
+            self.board = Board()
+        elif command == 'position':
+            self.stop()
+            self._position(args)
+        elif command == 'go':
+            self._go(args)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self._ponderhit()
+        elif command == 'quit':
+            self.stop()
+            return False
+        elif command != 'setoption':
+            self.send(f"info string unknown command {command}")
+        return True
+
+    def _position(self, args):
+        if args[:1] == ['startpos']:
+            board, rest = Board(), args[1:]
+        elif args[:1] == ['fen']:
+            fen_words = args[1:args.index('moves')] if 'moves' in args else args[1:]
+            try:
+                board = from_fen(' '.join(fen_words))
+            except ValueError as error:
+                self.send(f"info string bad fen: {error}")
+                return
+            rest = args[1 + len(fen_words):]
+        else:
+            self.send("info string position needs startpos or fen")
+            return
+        for text in rest[1:] if rest[:1] == ['moves'] else ():
+            try:
+                start, end = parse_move(text)
+            except ValueError:
+                self.send(f"info string bad move {text}")
+                return
+            piece = board.markup[start[0]][start[1] - 1]
+            if piece is None or piece.color != board.turn or board.make_move(start, end) is None:
+                self.send(f"info string illegal move {text}")
+                return
+        self.board = board
+
+    def _go(self, args):
+        if self._thread is not None and self._thread.is_alive():
+            self.send("info string already searching")
+            return
+        try:
+            limits = parse_go(args)
+        except ValueError as error:
+            self.send(f"info string {error}")
+            return
+        self._stop = threading.Event()
+        self._release = threading.Event()
+        waits = limits.get('infinite') or limits.get('ponder')
+        if not waits:
+            self._release.set()
+        # a ponder search keeps its depth and node limits, but the clock only starts at ponderhit
+        self._ponder_limits = limits if limits.get('ponder') else None
+        if limits.get('infinite'):
+            search_limits = {}
+        elif limits.get('ponder'):
+            search_limits = {name: value for name, value in limits.items() if name not in _TIME_LIMITS}
+        else:
+            search_limits = limits
+        self._thread = threading.Thread(target=self._search, daemon=True,
+                                        args=(self.board.copy(), search_limits, self._stop, self._release))
+        self._thread.start()
+
+    def _search(self, board, limits, stop, release):
+        started = time.perf_counter()
+
+        def report(result):
+            elapsed = time.perf_counter() - started
+            nps = int(result.nodes / elapsed) if elapsed > 0 else 0
+            self.send(f"info depth {result.depth} score {score_text(result.score)} nodes {result.nodes} "
+                      f"nps {nps} time {int(elapsed * 1000)} pv {' '.join(format_move(move) for move in result.pv)}")
+
+        if board.generate_moves(board.turn):
+            result = self.engine.search(board, depth=limits.get('depth'), time_limit=time_budget(limits, board.turn),
+                                        nodes=limits.get('nodes'), stop=stop, on_iteration=report)
+        else:
+            result = None
+        # UCI: after go infinite or go ponder, bestmove waits for stop or ponderhit
+        release.wait()
+        if result is None or result.move is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {format_move(result.move)} ponder {format_move(result.pv[1])}")
+        else:
+            self.send(f"bestmove {format_move(result.move)}")
+
+    def _ponderhit(self):
+        limits = self._ponder_limits
+        if limits is None or self._thread is None or not self._thread.is_alive():
+            return
+        self._ponder_limits = None
+        budget = time_budget(limits, self.board.turn)
+        if budget is not None:
+            timer = threading.Timer(budget, self._stop.set)
+            timer.daemon = True
+            timer.start()
+        self._release.set()
+
+    def stop(self):
+        """Stops a running search and waits until its bestmove has been sent."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._release.set()
+        self._thread.join()
+        self._thread = None
+        self._ponder_limits = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UCI-style engine protocol on standard input and output.")
+    parser.add_argument('--tt-size', type=int, default=1 << 18, help="transposition table slots")
+    args = parser.parse_args(argv)
+
+    protocol = UciEngine(engine=Engine(tt_size=args.tt_size))
+    for line in sys.stdin:
+        if not protocol.handle(line):
+            break
+    else:
+        protocol.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())